@@ -1,6 +1,9 @@
+import io
 import json
 import unittest
 
+from unittest.mock import Mock
+
 import pytest
 
 from transcriptic import english
@@ -468,3 +471,237 @@ class AP2EnTestCase(unittest.TestCase):
             ],
         )
         self.assertEqual(forest, [[1]])
+
+    def test_unknown_instruction(self):
+        pjson = {
+            "refs": {},
+            "instructions": [
+                {"op": "teleport", "object": "test_plate"},
+                {"op": "job_tree", "object": "test_plate"},
+                {"op": "seal", "object": "test_plate", "type": "ultra-clear"},
+            ],
+        }
+        parser_instance = english.AutoprotocolParser(pjson)
+
+        self.assertEqual(
+            parser_instance.parsed_output,
+            [
+                "[Unknown instruction]",
+                "[Unknown instruction]",
+                "Seal test_plate (ultra-clear)",
+            ],
+        )
+
+    def test_pipette_and_stamp_transfers(self):
+        pjson = {
+            "refs": {},
+            "instructions": [
+                {
+                    "op": "pipette",
+                    "groups": [
+                        {
+                            "transfer": [
+                                {"volume": "5:microliter", "from": "a/0", "to": "b/0"},
+                                {"volume": "1:microliter", "from": "a/0", "to": "b/1"},
+                            ]
+                        }
+                    ],
+                },
+                {
+                    "op": "stamp",
+                    "groups": [
+                        {
+                            "transfer": [
+                                {"volume": "2:microliter", "from": "a/0", "to": "c/0"},
+                                {"volume": "2:microliter", "from": "b/0", "to": "c/0"},
+                            ],
+                            "shape": {"rows": 8, "columns": 12},
+                        }
+                    ],
+                },
+            ],
+        }
+        parser_instance = english.AutoprotocolParser(pjson)
+
+        self.assertEqual(
+            parser_instance.parsed_output,
+            [
+                "Transfer 5 microliters from a/0 to b/0 ",
+                "Transfer 1 microliter from a/0 to b/1 with the same tip as previous",
+                "Stamp 2 microliters from source origin a/0 to destination origin "
+                "c/0  (8 rows x 12 columns)",
+                "Stamp 2 microliters from source origin b/0 to destination origin "
+                "c/0 with the same set of tips as previous (8 rows x 12 columns)",
+            ],
+        )
+        self.assertEqual(
+            parser_instance.object_list,
+            [["['a', 'a']", "['b', 'b']"], ["['a', 'b']", "['c', 'c']"]],
+        )
+
+    def test_parse_to_file(self):
+        pjson = {
+            "refs": {},
+            "instructions": [
+                {"op": "cover", "object": "test_plate", "lid": "standard"},
+                {"op": "uncover", "object": "test_plate"},
+            ],
+        }
+        output = io.StringIO()
+        english.AutoprotocolParser(pjson, file=output)
+
+        self.assertEqual(
+            output.getvalue(),
+            "1. Cover test_plate with a standard lid\n2. Uncover test_plate\n",
+        )
+
+    def test_iter_parsed(self):
+        pjson = {
+            "refs": {},
+            "instructions": [
+                {"op": "cover", "object": "test_plate", "lid": "standard"},
+                {"op": "uncover", "object": "test_plate"},
+            ],
+        }
+        parser_instance = english.AutoprotocolParser(pjson, file=io.StringIO())
+        lines = parser_instance.iter_parsed(pjson)
+
+        self.assertEqual(next(lines), "Cover test_plate with a standard lid")
+        self.assertEqual(parser_instance.object_list, [["test_plate"]])
+        self.assertEqual(list(lines), ["Uncover test_plate"])
+
+    def test_incubate_unknown_location(self):
+        pjson = {
+            "refs": {},
+            "instructions": [
+                {
+                    "op": "incubate",
+                    "object": "test_plate",
+                    "where": "warm_35",
+                    "duration": "2:hour",
+                    "shaking": False,
+                },
+                {"op": "uncover", "object": "test_plate"},
+            ],
+        }
+        parser_instance = english.AutoprotocolParser(pjson)
+
+        self.assertEqual(
+            parser_instance.parsed_output,
+            ["Incubate test_plate at warm_35 for 2 hours", "Uncover test_plate"],
+        )
+
+    def test_malformed_instruction(self):
+        pjson = {
+            "refs": {},
+            "instructions": [
+                {
+                    "op": "provision",
+                    "resource_id": "rs123",
+                    "to": [{"well": "test_plate/0", "volume": {"value": 5}}],
+                },
+                {"op": "uncover", "object": "test_plate"},
+            ],
+        }
+        parser_instance = english.AutoprotocolParser(pjson)
+
+        self.assertEqual(
+            parser_instance.parsed_output,
+            ["[Unknown instruction]", "Uncover test_plate"],
+        )
+
+    def test_handler_type_error_is_raised(self):
+        class BrokenParser(english.AutoprotocolParser):
+            def uncover(self, opts):
+                return len(None)
+
+        pjson = {"refs": {}, "instructions": [{"op": "uncover", "object": "p"}]}
+
+        with self.assertRaises(TypeError):
+            BrokenParser(pjson)
+
+    def test_illumina_multiple_plates(self):
+        pjson = {
+            "refs": {},
+            "instructions": [
+                {
+                    "op": "illumina_sequence",
+                    "lanes": [
+                        {"object": "plate_a/0", "library_concentration": 1.0},
+                        {"object": "plate_b/0", "library_concentration": 1.0},
+                    ],
+                    "library_size": 34,
+                }
+            ],
+        }
+        parser_instance = english.AutoprotocolParser(pjson)
+
+        self.assertEqual(
+            parser_instance.parsed_output,
+            [
+                "Illumina sequence the corresponding wells of plates "
+                "plate_a, plate_b with library size 34"
+            ],
+        )
+
+    def test_longest_repeated_substring(self):
+        self.assertEqual(english._longest_repeated_substring(""), "")
+        self.assertEqual(english._longest_repeated_substring("abc"), "")
+        # Occurrences may not overlap
+        self.assertEqual(english._longest_repeated_substring("aaaa"), "aa")
+        self.assertEqual(english._longest_repeated_substring("aaa"), "a")
+        # Earliest substring wins ties
+        self.assertEqual(english._longest_repeated_substring("abxab-cdcd"), "ab")
+        self.assertEqual(
+            english._longest_repeated_substring("[0, [1, [2]], [3, [1, [2]]]]"),
+            ", [1, [2]]",
+        )
+
+    def test_job_tree_to_file(self):
+        pjson = {
+            "refs": {},
+            "instructions": [
+                {"op": "cover", "object": "test_plate", "lid": "standard"},
+                {"op": "uncover", "object": "test_plate"},
+                {"op": "cover", "object": "other_plate", "lid": "standard"},
+            ],
+        }
+        parser_instance = english.AutoprotocolParser(pjson, file=io.StringIO())
+        output = io.StringIO()
+        parser_instance.job_tree(file=output)
+
+        self.assertEqual(parser_instance.forest_list, [[1, [2]], [3]])
+        self.assertEqual(
+            output.getvalue(),
+            "\nA suggested Job Tree based on container dependency: \n\n"
+            "1\n+---2\n3\n",
+        )
+
+    def test_resource_names_looked_up_once(self):
+        api = Mock()
+        api.resources.side_effect = lambda resource_id: {
+            "results": [{"name": "Water"}] if resource_id == "rs-water" else []
+        }
+        pjson = {
+            "refs": {},
+            "instructions": [
+                {
+                    "op": "provision",
+                    "resource_id": resource_id,
+                    "to": [{"well": "test_plate/0", "volume": "5:microliter"}],
+                }
+                for resource_id in ("rs-water", "rs-missing", "rs-water", "rs-missing")
+            ],
+        }
+        parser_instance = english.AutoprotocolParser(pjson, api=api)
+
+        self.assertEqual(
+            parser_instance.parsed_output,
+            [
+                "Provision 5 microliters of water to well 0 of container test_plate",
+                "Provision 5 microliters of resource with resource ID rs-missing to "
+                "well 0 of container test_plate",
+            ]
+            * 2,
+        )
+        self.assertEqual(api.resources.call_count, 2)
@@ -1,7 +1,10 @@
+import io
 import json
+import os
 import re
 import tempfile
 import unittest
+import zipfile
 
 from email.utils import formatdate
 
@@ -63,6 +66,32 @@ class ConnectionInitTests(unittest.TestCase):
             with self.assertRaisesRegexp(OSError, "token"):
                 transcriptic.config.Connection.from_file(config_file.name)
 
+    def test_from_file_reloads_modified_config(self):
+        config = {
+            "email": "somebody@transcriptic.com",
+            "token": "foobarinvalid",
+            "organization_id": "transcriptic",
+            "api_root": "http://foo:5555",
+            "analytics": True,
+            "user_id": "ufoo2",
+        }
+        with tempfile.NamedTemporaryFile() as config_file:
+            with open(config_file.name, "w") as f:
+                json.dump(config, f)
+            connection = transcriptic.config.Connection.from_file(config_file.name)
+            self.assertEqual(connection.organization_id, "transcriptic")
+
+            with open(config_file.name, "w") as f:
+                json.dump(dict(config, organization_id="other-org"), f)
+            connection = transcriptic.config.Connection.from_file(config_file.name)
+            self.assertEqual(connection.organization_id, "other-org")
+
+            # a re-login writing a token of the same length is picked up too
+            with open(config_file.name, "w") as f:
+                json.dump(dict(config, token="foobarrenewed"), f)
+            connection = transcriptic.config.Connection.from_file(config_file.name)
+            self.assertEqual(connection.token, "foobarrenewed")
+
     def get_mocked_connection(self):
         # NOTE(meawoppl) - This could be the start of a testing pattern
         # for this module.
@@ -83,6 +112,231 @@ class ConnectionInitTests(unittest.TestCase):
         )
         return session, connection
 
+    def get_responses_connection(self):
+        # Connection on the default session, so `responses` can mock its requests
+        return transcriptic.config.Connection(
+            email="foo@transcriptic.com",
+            token="bar",
+            organization_id="txid",
+            api_root="https://fake.transcriptic.com",
+        )
+
+    def test_default_session_pools_connections(self):
+        session = transcriptic.config.initialize_default_session()
+        adapter = session.get_adapter("https://secure.strateos.com/")
+        self.assertEqual(adapter._pool_maxsize, 50)
+        self.assertEqual(adapter.max_retries.total, 3)
+        self.assertIn(503, adapter.max_retries.status_forcelist)
+
+    def test_cookie_and_token_exclusive(self):
+        connection = self.get_responses_connection()
+        with pytest.warns(UserWarning, match="Clearing email and token"):
+            connection.cookie = "session=baz"
+        self.assertIsNone(connection.email)
+        self.assertIsNone(connection.token)
+        with pytest.warns(UserWarning, match="Clearing cookie"):
+            connection.token = "bar"
+        self.assertIsNone(connection.cookie)
+        self.assertEqual(connection.token, "bar")
+
+    def test_get_route_cache_invalidation(self):
+        _, connection = self.get_mocked_connection()
+
+        route = connection.get_route("get_project", project_id="p123")
+        self.assertEqual(route, "https://fake.transcriptic.com/txid/p123")
+        self.assertIs(connection.get_route("get_project", project_id="p123"), route)
+
+        connection.organization_id = "other"
+        self.assertEqual(
+            connection.get_route("get_project", project_id="p123"),
+            "https://fake.transcriptic.com/other/p123",
+        )
+
+        # Directly reassigning the environment also invalidates cached routes
+        connection.env_args = dict(connection.env_args, org_id="txid")
+        self.assertEqual(connection.get_route("get_project", project_id="p123"), route)
+
+        # the environment properties read the reassigned values as well
+        connection.env_args = dict(connection.env_args, project_id="p9")
+        self.assertEqual(connection.api_root, "https://fake.transcriptic.com")
+        self.assertEqual(connection.organization_id, "txid")
+        self.assertEqual(connection.project_id, "p9")
+
+        # and the url prefix, so both url builders agree
+        connection.env_args = dict(
+            connection.env_args, org_id="org2", api_root="https://y.example.com"
+        )
+        self.assertEqual(
+            connection.get_route("get_project", project_id="p123"),
+            "https://y.example.com/org2/p123",
+        )
+        self.assertEqual(connection.url("p123"), "https://y.example.com/org2/p123")
+
+    def test_get_route_env_args_changed_in_place(self):
+        _, connection = self.get_mocked_connection()
+
+        self.assertEqual(
+            connection.get_route("get_project", project_id="p1"),
+            "https://fake.transcriptic.com/txid/p1",
+        )
+        self.assertEqual(connection.url("p"), "https://fake.transcriptic.com/txid/p")
+
+        connection.env_args["org_id"] = "o2"
+        self.assertEqual(connection.organization_id, "o2")
+        self.assertEqual(
+            connection.get_route("get_project", project_id="p1"),
+            "https://fake.transcriptic.com/o2/p1",
+        )
+        self.assertEqual(connection.url("p"), "https://fake.transcriptic.com/o2/p")
+
+        connection.env_args.update(api_root="https://x.example.com")
+        self.assertEqual(
+            connection.get_route("get_project", project_id="p1"),
+            "https://x.example.com/o2/p1",
+        )
+        self.assertEqual(connection.url("p"), "https://x.example.com/o2/p")
+
+    @responses.activate
+    def test_query_revalidated_with_etag(self):
+        connection = self.get_responses_connection()
+        route = connection.get_route("query_resources", query="water")
+        results = {"results": [{"name": "Water"}]}
+        responses.add(responses.GET, route, json=results, headers={"ETag": '"v1"'})
+        responses.add(responses.GET, route, status=304)
+
+        self.assertEqual(connection.resources("water"), results)
+        self.assertEqual(connection.resources("water"), results)
+        self.assertNotIn("If-None-Match", responses.calls[0].request.headers)
+        self.assertEqual(responses.calls[1].request.headers["If-None-Match"], '"v1"')
+
+    @responses.activate
+    def test_get_zip(self):
+        connection = self.get_responses_connection()
+        archive = io.BytesIO()
+        with zipfile.ZipFile(archive, "w") as zf:
+            zf.writestr("data.csv", "a,b\n1,2\n")
+        route = connection.get_route("get_data_zip", data_id="d123")
+        responses.add(responses.GET, route, body=archive.getvalue())
+        responses.add(responses.GET, route, body=archive.getvalue())
+
+        zf = connection.get_zip("d123")
+        self.assertEqual(zf.read("data.csv"), b"a,b\n1,2\n")
+        with tempfile.TemporaryDirectory() as tmpdir:
+            file_path = os.path.join(tmpdir, "d123.zip")
+            connection.get_zip("d123", file_path=file_path)
+            with open(file_path, "rb") as f:
+                self.assertEqual(f.read(), archive.getvalue())
+
+    @responses.activate
+    def test_upload_text_buffer(self):
+        connection = self.get_responses_connection()
+        upload_url = "https://uploads.example.com/u123"
+        responses.add(
+            responses.POST,
+            connection.get_route("upload"),
+            json={"data": {"id": "u123", "attributes": {"upload_url": upload_url}}},
+        )
+        responses.add(responses.PUT, upload_url)
+
+        text = "µL,°C\n" * 10
+        upload_id = connection.upload_to_uri(
+            io.StringIO(text), "text/csv", "title", "data.csv"
+        )
+
+        self.assertEqual(upload_id, "u123")
+        file_size = json.loads(responses.calls[0].request.body)["data"]["attributes"][
+            "file_size"
+        ]
+        self.assertEqual(file_size, len(text.encode("utf-8")))
+        put_request = responses.calls[1].request
+        self.assertEqual(put_request.headers["Content-Length"], str(file_size))
+        self.assertNotIn("Transfer-Encoding", put_request.headers)
+        self.assertEqual(put_request.body, text.encode("utf-8"))
+
+    @responses.activate
+    def test_upload_unseekable_handle(self):
+        connection = self.get_responses_connection()
+        upload_url = "https://uploads.example.com/u123"
+        responses.add(
+            responses.POST,
+            connection.get_route("upload"),
+            json={"data": {"id": "u123", "attributes": {"upload_url": upload_url}}},
+        )
+        responses.add(responses.PUT, upload_url)
+
+        read_fd, write_fd = os.pipe()
+        os.write(write_fd, b"a,b\n1,2\n")
+        os.close(write_fd)
+        with os.fdopen(read_fd, "rb") as pipe:
+            upload_id = connection.upload_to_uri(pipe, "text/csv", "title", "data.csv")
+
+        self.assertEqual(upload_id, "u123")
+        file_size = json.loads(responses.calls[0].request.body)["data"]["attributes"][
+            "file_size"
+        ]
+        self.assertEqual(file_size, 0)
+
+    def test_get_route_arguments(self):
+        connection = self.get_responses_connection()
+        self.assertEqual(
+            connection.get_route("query_kits", query=0),
+            "https://fake.transcriptic.com/_commercial/kits?q=0&per_page=1000&full_json=true",
+        )
+        for query in (None, ""):
+            with self.assertRaisesRegex(Exception, "query needs to be provided"):
+                connection.get_route("query_kits", query=query)
+
+    @responses.activate
+    def test_post_analytics(self):
+        connection = self.get_responses_connection()
+        route = "https://www.google-analytics.com/collect"
+        responses.add(responses.POST, route)
+        connection._post_analytics(client_id="u 1", event_action="submit&run")
+        self.assertEqual(
+            responses.calls[0].request.body,
+            "v=1&tid=UA-28937242-7&cid=u+1&t=event&ea=submit%26run&ec=cli",
+        )
+        self.assertNotIn("X-User-Token", responses.calls[0].request.headers)
+
+        responses.replace(
+            responses.POST, route, body=requests.exceptions.ConnectTimeout()
+        )
+        connection._post_analytics(client_id="u1", event_action="submit")
+
+    def test_url(self):
+        _, connection = self.get_mocked_connection()
+
+        self.assertEqual(
+            connection.url("p123/runs"), "https://fake.transcriptic.com/txid/p123/runs"
+        )
+        self.assertEqual(
+            connection.url("/api/runs"), "https://fake.transcriptic.com/api/runs"
+        )
+
+        connection.organization_id = "other"
+        connection.api_root = "https://other.transcriptic.com"
+        self.assertEqual(
+            connection.url("p123"), "https://other.transcriptic.com/other/p123"
+        )
+
+    def test_response_parsed_once(self):
+        session, connection = self.get_mocked_connection()
+        response = Mock(status_code=200)
+        response.json.return_value = {"data": {"attributes": {"name": "foo"}}}
+        session.get = Mock(return_value=response)
+
+        self.assertEqual(connection.data_object("do123")["name"], "foo")
+        response.json.assert_called_once_with()
+
+    def test_submit_run_error_message(self):
+        session, connection = self.get_mocked_connection()
+        session.post = Mock(return_value=Mock(status_code=422, text="Invalid refs"))
+
+        with self.assertRaisesRegex(
+            transcriptic.config.AnalysisException, "Error creating run: Invalid refs"
+        ):
+            connection.submit_run({"refs": {}, "instructions": []}, project_id="p123")
+
     def test_aliquot_modify(self):
         session, connection = self.get_mocked_connection()
 
@@ -1,6 +1,9 @@
+from unittest.mock import Mock
+
 import pandas as pd
 import pytest
 import requests
+import responses
 
 from transcriptic.sampledata import load_sample_container
 from transcriptic.sampledata.connection import MockConnection
@@ -70,6 +73,26 @@ class TestMockConnection:
         assert project_runs.loc[0].id == "r123"
         assert project_runs.loc[0].Name == "Sample Run"
 
+    def test_jupyter_project_lookups_reuse_listing(self, monkeypatch):
+        from transcriptic import Project
+
+        mock_connection = MockConnection()
+        projects = Mock(wraps=mock_connection.projects)
+        monkeypatch.setattr(mock_connection, "projects", projects)
+
+        assert Project("sample project").id == "p123"
+        assert Project("p123").name == "sample project"
+        assert projects.call_count == 1
+
+        # Unknown names list the projects again before giving up
+        with pytest.raises(TypeError, match="p456 is not found in your projects."):
+            Project("p456")
+        assert projects.call_count == 2
+
+        Project.clear_cache()
+        Project("p123")
+        assert projects.call_count == 3
+
     def test_jupyter_run(self):
         from transcriptic import Run
 
@@ -105,6 +128,11 @@ class TestMockConnection:
         )
         assert instructions.loc[1].Instructions.generated_containers == []
 
+        warps = instructions.loc[1].Instructions.warps
+        assert warps.columns.tolist()[:4] == ["Name", "WarpId", "Completed", "Started"]
+        assert warps.Name.dtype == "category"
+        assert warps.loc[0].Name == "PlateReader.ReadAbsorbance"
+
         data = run.data
         assert len(data) == 1
         assert data.loc[0].Name == "OD600"
@@ -112,6 +140,20 @@ class TestMockConnection:
         datasets = run.Datasets
         assert len(datasets) == 1
 
+    def test_instruction_device_ids(self):
+        from transcriptic.jupyter import Instruction
+
+        attributes = sample_run_attr["instructions"][1]
+        assert Instruction(attributes).device_id == attributes["warps"][0]["device_id"]
+
+        warps = [
+            {**attributes["warps"][0], "device_id": device_id}
+            for device_id in ("dev1", "dev2")
+        ]
+        with pytest.warns(UserWarning, match="more than one device"):
+            instruction = Instruction({**attributes, "warps": warps})
+        assert instruction.device_id == "dev1"
+
     def test_jupyter_container(self):
         from transcriptic import Container
 
@@ -127,6 +169,41 @@ class TestMockConnection:
         assert container.connection == mock_connection
         assert container.attributes == sample_container_attr
 
+        aliquots = container.aliquots
+        assert aliquots.index.name == "Well Index"
+        assert aliquots.columns.tolist() == ["Name", "Id", "Volume"]
+        assert str(aliquots.loc[0].Volume) == "99:microliter"
+
+    def test_container_aliquot_properties(self):
+        from transcriptic import Container
+
+        attributes = {
+            **sample_container_attr,
+            "aliquots": [
+                {
+                    "id": "aq2",
+                    "well_idx": 2,
+                    "name": "b",
+                    "volume_ul": "5.0",
+                    "properties": {"barcode": "x2"},
+                },
+                {
+                    "id": "aq1",
+                    "well_idx": 1,
+                    "name": "a",
+                    "volume_ul": "10.0",
+                    "properties": {"conc": 1.5, "barcode": "x1"},
+                },
+            ],
+        }
+        container = Container("ct123", attributes, MockConnection())
+
+        aliquots = container.aliquots
+        assert aliquots.index.tolist() == [1, 2]
+        assert aliquots.columns.tolist() == ["Name", "Id", "Volume", "conc", "barcode"]
+        assert aliquots.barcode.tolist() == ["x1", "x2"]
+        assert aliquots.conc.isna().tolist() == [False, True]
+
     def test_jupyter_dataset(self):
         from transcriptic import Dataset
 
@@ -161,6 +238,62 @@ class TestMockConnection:
         }
         assert len(dataset.data.columns) == 9
 
+        aliquot_data = dataset.cross_ref_aliquots()
+        assert aliquot_data["Aliquot Data"].tolist() == [
+            0.05,
+            0.04,
+            0.06,
+            1.21,
+            1.13,
+            1.32,
+            2.22,
+            2.15,
+            2.37,
+        ]
+        assert "Aliquot Data" not in dataset.container.aliquots
+
+        # Data without a row labelled 0 has no data for any well
+        dataset._data = pd.DataFrame({"Z9": [1.0]}, index=[5])
+        with pytest.warns(UserWarning, match="not found as data keys"):
+            aliquot_data = dataset.cross_ref_aliquots()
+        assert aliquot_data["Aliquot Data"].isna().all()
+
+    @responses.activate
+    def test_data_objects_eager_data(self, monkeypatch):
+        from transcriptic.jupyter import DataObject
+        from transcriptic.jupyter.dataobject import (
+            _DOWNLOAD_POOL_SIZE,
+            _download_session,
+        )
+
+        mock_connection = MockConnection()
+        attributes = [
+            {"id": f"do{i}", "url": f"https://s3.example.com/do{i}"} for i in range(3)
+        ]
+        monkeypatch.setattr(mock_connection, "data_objects", lambda _: attributes)
+        for attr in attributes:
+            responses.add(responses.GET, attr["url"], body=attr["id"].encode())
+
+        with pytest.raises(ValueError, match="max_workers"):
+            DataObject.init_from_dataset_id(
+                "d123", eager_data=True, max_workers=_DOWNLOAD_POOL_SIZE + 1
+            )
+
+        data_objects = DataObject.init_from_dataset_id(
+            "d123", eager_data=True, max_workers=_DOWNLOAD_POOL_SIZE
+        )
+        assert len(responses.calls) == 3
+        assert [data_object.data for data_object in data_objects] == [
+            b"do0",
+            b"do1",
+            b"do2",
+        ]
+        assert len(responses.calls) == 3
+
+        # Concurrent downloads never outnumber the pooled connections
+        adapter = _download_session().get_adapter("https://s3.example.com")
+        assert adapter._pool_maxsize >= _DOWNLOAD_POOL_SIZE
+
     def test_load_sample_objects(self):
         mock_connection = MockConnection()
 
@@ -4,7 +4,6 @@ import os
 import sys
 
 import click
-import requests
 
 from transcriptic import commands
 from transcriptic.config import Connection
@@ -171,12 +170,9 @@ def cli(ctx, api_root, email, token, organization, config):
             ctx.obj.api = Connection()  # Initialize empty connection
             ctx.invoke(login_cmd, api_root=api_root, analytics=analytics)
     if ctx.obj.api.analytics:
-        try:
-            ctx.obj.api._post_analytics(
-                event_action=ctx.invoked_subcommand, event_category="cli"
-            )
-        except requests.exceptions.RequestException:
-            pass
+        ctx.obj.api._post_analytics(
+            event_action=ctx.invoked_subcommand, event_category="cli"
+        )
 
 
 @cli.command("submit", cls=FeatureCommand, feature="can_submit_autoprotocol")
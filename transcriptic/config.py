@@ -1,3 +1,4 @@
+import functools
 import http.client as http_client
 import inspect
 import io
@@ -5,6 +6,8 @@ import json
 import logging
 import os
 import platform
+import shutil
+import tempfile
 import time
 import warnings
 import zipfile
@@ -13,6 +16,8 @@ import requests
 import transcriptic
 
 from Crypto.PublicKey import RSA
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 from . import routes
 from .auth import AuthSession, StrateosBearerAuth, StrateosSign
@@ -20,31 +25,157 @@ from .util import is_valid_jwt_token
 from .version import __version__
 
 
-try:
-    import magic
-except ImportError:
-    warnings.warn(
-        "`python-magic` is recommended. You may be missing some system-level "
-        "dependencies if you have already pip-installed it.\n"
-        "Please refer to https://github.com/ahupp/python-magic#installation "
-        "for more installation instructions."
+# Upper bound on memoized routes per Connection, routes such as
+# `get_release_status` embed timestamps and would otherwise grow unbounded
+_ROUTE_CACHE_MAXSIZE = 256
+
+# Upper bound on query responses kept per Connection for ETag revalidation
+_ETAG_CACHE_MAXSIZE = 64
+
+# Copy size for streamed downloads, and the largest zip kept in memory rather
+# than in a temporary file
+_DOWNLOAD_CHUNK_SIZE = 1 << 20
+_IN_MEMORY_ZIP_MAX_SIZE = 8 << 20
+
+# Number of characters encoded at a time when uploading text buffers
+_UPLOAD_CHUNK_SIZE = 1 << 20
+
+
+class _EnvArgs(dict):
+    """
+    Environment args of a Connection. Every modification bumps `version`, so
+    the routes and url prefix derived from them can tell when the args were
+    changed in place.
+    """
+
+    version = 0
+
+    def __setitem__(self, key, value):
+        super().__setitem__(key, value)
+        self.version += 1
+
+    def __delitem__(self, key):
+        super().__delitem__(key)
+        self.version += 1
+
+    def __ior__(self, other):
+        self.update(other)
+        return self
+
+    def clear(self):
+        super().clear()
+        self.version += 1
+
+    def pop(self, *args):
+        value = super().pop(*args)
+        self.version += 1
+        return value
+
+    def popitem(self):
+        item = super().popitem()
+        self.version += 1
+        return item
+
+    def setdefault(self, key, default=None):
+        value = super().setdefault(key, default)
+        self.version += 1
+        return value
+
+    def update(self, *args, **kwargs):
+        super().update(*args, **kwargs)
+        self.version += 1
+
+
+@functools.lru_cache(maxsize=None)
+def _user_agent():
+    """
+    User-Agent sent with every request. The `platform` lookups may shell out, so
+    this is only computed once per process.
+    """
+    return (
+        f"txpy/{__version__} "
+        f"({platform.python_implementation()}/"
+        f"{platform.python_version()}; "
+        f"{platform.system()}/{platform.release()}; "
+        f"{platform.machine()}; {platform.architecture()[0]})"
     )
 
 
+@functools.lru_cache(maxsize=None)
+def _import_magic():
+    """
+    Imports `python-magic` on first use since loading libmagic is comparatively
+    expensive. Returns None if it is unavailable.
+    """
+    try:
+        import magic
+    except ImportError:
+        warnings.warn(
+            "`python-magic` is recommended. You may be missing some system-level "
+            "dependencies if you have already pip-installed it.\n"
+            "Please refer to https://github.com/ahupp/python-magic#installation "
+            "for more installation instructions."
+        )
+        return None
+    return magic
+
+
+@functools.lru_cache(maxsize=None)
+def _analytics_session():
+    """
+    Session used for analytics events. It is kept apart from the `Connection`
+    session so credentials in its headers are never sent to third parties.
+    """
+    return requests.Session()
+
+
+@functools.lru_cache(maxsize=None)
+def _route_spec(method):
+    """
+    Returns the `routes` function for `method` along with the names of its
+    required arguments. Route signatures are fixed, so they are only inspected
+    once.
+    """
+    route_method = getattr(routes, method)
+    spec = inspect.getfullargspec(route_method)
+    route_method_args = spec.args
+    if spec.defaults:
+        route_method_args = route_method_args[: -len(spec.defaults)]
+    return route_method, tuple(route_method_args)
+
+
 def initialize_default_session():
     """
     Initialize a default `requests.Session()` object which can be used for
     requests into the tx web api.
     """
     session = AuthSession()
+    # Keep connections alive across calls and retry requests without a body on
+    # transient gateway errors, streamed upload bodies cannot be replayed. The
+    # last response is returned once retries are exhausted so it is still
+    # reported by `_handle_response`.
+    methods_kwarg = (
+        "allowed_methods"
+        if hasattr(Retry, "DEFAULT_ALLOWED_METHODS")
+        else "method_whitelist"  # urllib3 < 1.26
+    )
+    adapter = HTTPAdapter(
+        pool_connections=10,
+        pool_maxsize=50,
+        max_retries=Retry(
+            total=3,
+            backoff_factor=0.2,
+            status_forcelist=[502, 503, 504],
+            raise_on_status=False,
+            **{methods_kwarg: frozenset(["HEAD", "GET", "OPTIONS"])},
+        ),
+    )
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
     session.headers = {
         "Content-Type": "application/json",
         "Accept": "application/json",
-        "User-Agent": f"txpy/{__version__} "
-        f"({platform.python_implementation()}/"
-        f"{platform.python_version()}; "
-        f"{platform.system()}/{platform.release()}; "
-        f"{platform.machine()}; {platform.architecture()[0]})",
+        "User-Agent": _user_agent(),
     }
     return session
 
@@ -121,6 +252,10 @@ class Connection(object):
     ):
         # Initialize environment args used for computing routes
         self.env_args = dict()
+        self._route_cache = dict()
+        self._etag_cache = dict()
+        self._derived_env = None
+        self._derived_version = None
         self.api_root = api_root
 
         # Initialize session headers
@@ -138,7 +273,9 @@ class Connection(object):
         self.rsa_key = rsa_key
 
         # NB: These many setattr calls update self.session.headers
-        # cookie authentication is mutually exclusive from token authentication
+        # cookie authentication is mutually exclusive from token authentication,
+        # `_auth_mode` tracks which one currently has headers set
+        self._auth_mode = None
         self.organization_id = organization_id
         if cookie:
             if email is not None or token is not None:
@@ -169,8 +306,9 @@ class Connection(object):
                 self.token = token
             self.update_session_auth()
 
-        # Initialize feature groups
-        self.feature_groups = feature_groups
+        # Initialize feature groups, copied so that instances never share the
+        # default list
+        self.feature_groups = list(feature_groups) if feature_groups else []
 
         # Initialize CLI parameters
         self.verbose = verbose
@@ -183,8 +321,8 @@ class Connection(object):
     def from_file(path):
         """Loads connection from file"""
         config_path = os.path.expanduser(path)
-        with open(config_path) as f:
-            cfg = json.load(f)
+        with open(config_path, "rb") as f:
+            cfg = json.loads(f.read())
 
         expected_keys = set(
             ("email", "token", "organization_id", "api_root", "analytics", "user_id")
@@ -206,11 +344,25 @@ class Connection(object):
         """
         return Connection.from_file("~/.transcriptic")
 
+    @property
+    def env_args(self):
+        """
+        Environment args used for computing routes. Assigning a plain dict
+        stores a copy of it.
+        """
+        return self._env_args
+
+    @env_args.setter
+    def env_args(self, value):
+        if not isinstance(value, _EnvArgs):
+            value = _EnvArgs(value)
+        self._env_args = value
+
     @property
     def api_root(self):
         try:
             return self.env_args["api_root"]
-        except (NameError, KeyError):
+        except KeyError:
             raise ValueError("api_root is not set.")
 
     @api_root.setter
@@ -220,8 +372,8 @@ class Connection(object):
     @property
     def organization_id(self):
         try:
-            return self.session.headers["X-Organization-Id"]
-        except (NameError, KeyError):
+            return self.env_args["org_id"]
+        except KeyError:
             raise ValueError("organization_id is not set.")
 
     @organization_id.setter
@@ -233,7 +385,7 @@ class Connection(object):
     def project_id(self):
         try:
             return self.env_args["project_id"]
-        except (NameError, KeyError):
+        except KeyError:
             raise ValueError("project_id is not set.")
 
     @project_id.setter
@@ -249,13 +401,9 @@ class Connection(object):
 
     @email.setter
     def email(self, value):
-        if self.cookie is not None:
-            warnings.warn(
-                "Cookie and token authentication is mutually "
-                "exclusive. Clearing cookie from headers"
-            )
-            self.update_headers(**{"Cookie": None})
+        self._clear_cookie_auth()
         self.update_headers(**{"X-User-Email": value})
+        self._update_token_auth_mode()
         self.update_session_auth()
 
     @property
@@ -278,13 +426,9 @@ class Connection(object):
 
     @token.setter
     def token(self, value):
-        if self.cookie is not None:
-            warnings.warn(
-                "Cookie and token authentication is mutually "
-                "exclusive. Clearing cookie from headers"
-            )
-            self.update_headers(**{"Cookie": None})
+        self._clear_cookie_auth()
         self.update_headers(**{"X-User-Token": value})
+        self._update_token_auth_mode()
 
     @property
     def cookie(self):
@@ -295,13 +439,33 @@ class Connection(object):
 
     @cookie.setter
     def cookie(self, value):
-        if self.email is not None or self.token is not None:
+        if self._auth_mode == "token":
             warnings.warn(
                 "Cookie and token authentication is mutually "
                 "exclusive. Clearing email and token from headers"
             )
             self.update_headers(**{"X-User-Email": None, "X-User-Token": None})
         self.update_headers(**{"Cookie": value})
+        self._auth_mode = "cookie" if value is not None else None
+
+    def _clear_cookie_auth(self):
+        if self._auth_mode == "cookie":
+            warnings.warn(
+                "Cookie and token authentication is mutually "
+                "exclusive. Clearing cookie from headers"
+            )
+            self.update_headers(**{"Cookie": None})
+            self._auth_mode = None
+
+    def _update_token_auth_mode(self):
+        headers = self.session.headers
+        if (
+            headers.get("X-User-Email") is not None
+            or headers.get("X-User-Token") is not None
+        ):
+            self._auth_mode = "token"
+        else:
+            self._auth_mode = None
 
     @property
     def rsa_key(self):
@@ -376,21 +540,43 @@ class Connection(object):
         Updates environment variables used for computing routes.
         To remove an existing variable, set value to None.
         """
-        self.env_args = dict(self.env_args, **kwargs)
+        self.env_args.update(kwargs)
 
     def update_headers(self, **kwargs):
         """
         Updates session headers
         To remove an existing variable, set value to None.
         """
-        self.session.headers = dict(self.session.headers, **kwargs)
+        self.session.headers.update(kwargs)
+
+    def _update_org_prefix(self):
+        """Precomputes the organization-scoped prefix used by `url`"""
+        api_root = self.env_args.get("api_root")
+        org_id = self.env_args.get("org_id")
+        self._org_prefix = f"{api_root}/{org_id}/"
+
+    def _sync_env(self):
+        """
+        Refreshes the routes and url prefix derived from `env_args` when it has
+        been reassigned or modified since they were computed
+        """
+        env_args = self.env_args
+        if (
+            self._derived_env is not env_args
+            or self._derived_version != env_args.version
+        ):
+            self._route_cache.clear()
+            self._update_org_prefix()
+            self._derived_env = env_args
+            self._derived_version = env_args.version
 
     def url(self, path):
         """url format helper"""
+        self._sync_env()
         if path.startswith("/"):
             return f"{self.api_root}{path}"
         else:
-            return f"{self.api_root}/{self.organization_id}/{path}"
+            return self._org_prefix + path
 
     def preview_protocol(self, protocol):
         """Post protocol preview"""
@@ -476,7 +662,7 @@ class Connection(object):
     def create_project(self, title):
         """Create project with given title"""
         route = self.get_route("create_project")
-        return self.post(route, data=json.dumps({"name": title}))
+        return self.post(route, json={"name": title})
 
     def delete_project(self, project_id=None):
         """Delete project with given project_id"""
@@ -488,7 +674,7 @@ class Connection(object):
         route = self.get_route("archive_project", project_id=project_id)
         return self.put(
             route,
-            data=json.dumps({"project": {"archived": True}}),
+            json={"project": {"archived": True}},
             status_response={"200": lambda resp: True},
         )
 
@@ -528,12 +714,10 @@ class Connection(object):
         route = self.get_route("create_package")
         return self.post(
             route,
-            data=json.dumps(
-                {
-                    "name": "%s%s" % ("com.%s." % self.organization_id, name),
-                    "description": description,
-                }
-            ),
+            json={
+                "name": "%s%s" % ("com.%s." % self.organization_id, name),
+                "description": description,
+            },
         )
 
     def delete_package(self, package_id=None):
@@ -601,17 +785,43 @@ class Connection(object):
     def resources(self, query):
         """Get resources"""
         route = self.get_route("query_resources", query=query)
-        return self.get(route)
+        return self._get_revalidated(route)
 
     def inventory(self, query, timeout=30.0, page=0):
         """Get inventory"""
         route = self.get_route("query_inventory", query=query, page=page)
-        return self.get(route, timeout=timeout)
+        return self._get_revalidated(route, timeout=timeout)
 
     def kits(self, query):
         """Get kits"""
         route = self.get_route("query_kits", query=query)
-        return self.get(route)
+        return self._get_revalidated(route)
+
+    def _get_revalidated(self, route, **kwargs):
+        """
+        GET helper for read-only query routes. Responses carrying an ETag are
+        remembered, and later requests for the same route send `If-None-Match`
+        so that an unchanged payload is not transferred again.
+        """
+        cached = self._etag_cache.get(route)
+        if cached is not None:
+            kwargs["headers"] = dict(
+                kwargs.get("headers") or {}, **{"If-None-Match": cached[0]}
+            )
+        response = self.get(
+            route,
+            status_response={"200": lambda resp: resp, "304": lambda resp: resp},
+            **kwargs,
+        )
+        if response.status_code == 304:
+            # Parse the stored body so callers never share a mutable result
+            return json.loads(cached[1])
+        etag = response.headers.get("ETag")
+        if etag:
+            if len(self._etag_cache) >= _ETAG_CACHE_MAXSIZE:
+                self._etag_cache.clear()
+            self._etag_cache[route] = (etag, response.content)
+        return response.json()
 
     def payment_methods(self):
         route = self.get_route("get_payment_methods")
@@ -634,7 +844,7 @@ class Connection(object):
     def raw_image_data(self, data_id=None):
         """Get raw image data"""
         route = self.get_route("view_raw_image", data_id=data_id)
-        return self.get(route, status_response={"200": lambda resp: resp}, stream=True)
+        return self.get(route, status_response=_RAW_RESPONSE, stream=True)
 
     def _get_object(self, obj_id, obj_type=None):
         """Helper function for loading objects"""
@@ -673,7 +883,7 @@ class Connection(object):
 
         return self.post(
             self.get_route("analyze_run"),
-            data=json.dumps({"protocol": protocol, "test_mode": test_mode}),
+            json={"protocol": protocol, "test_mode": test_mode},
             status_response={"422": lambda resp: error_string(resp)},
         )
 
@@ -686,14 +896,11 @@ class Connection(object):
         payment_method_id=None,
     ):
         """Submit given protocol"""
-        protocol = _parse_protocol(protocol)
-        payload = {
-            "title": title,
-            "protocol": protocol,
-            "test_mode": test_mode,
-            "payment_method_id": payment_method_id,
-        }
-        data = {k: v for k, v in payload.items() if v is not None}
+        payload = {"protocol": _parse_protocol(protocol), "test_mode": test_mode}
+        if title is not None:
+            payload["title"] = title
+        if payment_method_id is not None:
+            payload["payment_method_id"] = payment_method_id
         route = self.get_route("submit_run", project_id=project_id)
         err_404 = (
             f"Error: Couldn't create run (404).\n Are you sure the "
@@ -701,24 +908,21 @@ class Connection(object):
             f"access to it?"
         )
 
-        def err_422(resp):
-            f"Error creating run: {resp.text}"
-
         return self.post(
             route,
-            data=json.dumps(data),
+            json=payload,
             status_response={
                 "404": lambda resp: AnalysisException(err_404),
-                "422": lambda resp: AnalysisException(err_422),
+                "422": lambda resp: AnalysisException(
+                    f"Error creating run: {resp.text}"
+                ),
             },
         )
 
     def analyze_launch_request(self, launch_request_id, test_mode=False):
         return self.post(
             self.get_route("analyze_launch_request"),
-            data=json.dumps(
-                {"launch_request_id": launch_request_id, "test_mode": test_mode}
-            ),
+            json={"launch_request_id": launch_request_id, "test_mode": test_mode},
         )
 
     def submit_launch_request(
@@ -732,18 +936,18 @@ class Connection(object):
         predecessor_id=None,
     ):
         """Submit specified launch request"""
-        payload = {
-            "title": title,
-            "launch_request_id": launch_request_id,
-            "protocol_id": protocol_id,
-            "test_mode": test_mode,
-            "payment_method_id": payment_method_id,
-            "predecessor_id": predecessor_id,
-        }
-        data = {k: v for k, v in payload.items() if v is not None}
+        payload = {"launch_request_id": launch_request_id, "test_mode": test_mode}
+        if title is not None:
+            payload["title"] = title
+        if protocol_id is not None:
+            payload["protocol_id"] = protocol_id
+        if payment_method_id is not None:
+            payload["payment_method_id"] = payment_method_id
+        if predecessor_id is not None:
+            payload["predecessor_id"] = predecessor_id
         return self.post(
             self.get_route("submit_launch_request", project_id=project_id),
-            data=json.dumps(data),
+            json=payload,
             status_response={
                 "404": lambda resp: AnalysisException(
                     "Error: Couldn't create run (404). \n"
@@ -775,10 +979,43 @@ class Connection(object):
         """
         return self.get(
             route=self.get_route(method="get_uploads", key=key),
-            status_response={"200": lambda resp: resp},
+            status_response=_RAW_RESPONSE,
             stream=True,
         )
 
+    def attachments_iter(self, data_id):
+        """Lazily fetches attachments for a given dataset id
+
+        Each attachment is only requested when the generator reaches it, and its
+        contents are left on the streamed response so that large files can be
+        written out with `iter_content` without being buffered in memory.
+
+        .. code-block:: python
+
+            for name, resp in api.attachments_iter("d123"):
+                with open(name, "wb") as f:
+                    for chunk in resp.iter_content(chunk_size=1 << 20):
+                        f.write(chunk)
+
+        Parameters
+        ----------
+        data_id : str
+            dataset id
+
+        Yields
+        ------
+        tuple(str, requests.Response)
+            attachment name and streamed response of its contents
+
+        """
+        dataset_route = self.get_route("dataset_short", data_id=data_id)
+        dataset_attachments = self.get(dataset_route).get("attachments")
+        for attachment in dataset_attachments:
+            yield (
+                os.path.basename(attachment.get("name", "")),
+                self._get_uploads_from_key(attachment.get("key")),
+            )
+
     def attachments(self, data_id):
         """Fetches all attachments for a given dataset id
 
@@ -793,16 +1030,7 @@ class Connection(object):
             a dict of attachment names and contents
 
         """
-        dataset_route = self.get_route("dataset_short", data_id=data_id)
-        dataset_attachments = self.get(dataset_route).get("attachments")
-        attachment_names = [
-            os.path.basename(_.get("name", "")) for _ in dataset_attachments
-        ]
-        attachment_contents = [
-            self._get_uploads_from_key(_.get("key")).content
-            for _ in dataset_attachments
-        ]
-        return dict(zip(attachment_names, attachment_contents))
+        return {name: resp.content for name, resp in self.attachments_iter(data_id)}
 
     def datasets(self, project_id=None, run_id=None, timeout=30.0):
         """Get datasets belonging to run"""
@@ -916,11 +1144,14 @@ class Connection(object):
         except (AttributeError, FileNotFoundError):
             raise ValueError("'file' has to be a valid filepath")
 
-        try:
-            content_type = magic.from_file(file_path, mime=True)
-        except NameError:
+        magic = _import_magic()
+        if magic is None:
             # Handle issues with magic import by not decoding content_type
             content_type = None
+        else:
+            # Sniff from the already opened handle rather than reopening the file
+            content_type = magic.from_buffer(file_handle.read(2048), mime=True)
+            file_handle.seek(0)
         return self.upload_dataset(
             file_handle,
             name,
@@ -964,7 +1195,9 @@ class Connection(object):
         Parameters
         ----------
         file_handle: file_handle
-            File handle to be uploaded
+            File handle to be uploaded. Binary handles such as `io.BytesIO` or
+            files opened with "rb" are sent as-is, `io.StringIO` buffers are
+            encoded to utf-8 while uploading.
         name: str
             Dataset filename
         title: str
@@ -1025,21 +1258,24 @@ class Connection(object):
         """
         # NOTE(meawoppl) title argument is unused?
 
-        # TODO:
-        # Currently, we are passing `0` for file_size as it doesn't really
-        # matter for non multipart uploads, though it would be better to
-        # supply the correct value.
+        if isinstance(file_handle, io.StringIO):
+            # io.StringIO instances are encoded to bytes as they are sent
+            file_handle = _Utf8Reader(file_handle)
+            file_size = len(file_handle)
+        else:
+            file_size = _file_size(file_handle)
+
         data = {
             "attributes": {
                 "file_name": name,
-                "file_size": 0,
+                "file_size": file_size,
                 "last_modified": int(time.time()),
                 "is_multipart": False,
             }
         }
 
         uri_route = self.get_route("upload")
-        uri_resp = self.post(uri_route, data=json.dumps({"data": data}))
+        uri_resp = self.post(uri_route, json={"data": data})
 
         try:
             upload_id = uri_resp["data"]["id"]
@@ -1047,13 +1283,6 @@ class Connection(object):
         except KeyError:
             raise RuntimeError("Unexpected payload returned for upload_dataset")
 
-        if isinstance(file_handle, io.StringIO):
-            try:
-                # io.StringIO instances must be converted to bytes
-                file_handle = io.BytesIO(bytes(file_handle.getvalue(), "utf-8"))
-            except AttributeError:
-                raise ValueError("Unable to convert read buffer to bytes")
-
         headers = {
             "Content-Disposition": f"attachment; filename={name}",
             "Content-Type": content_type,
@@ -1063,7 +1292,7 @@ class Connection(object):
             upload_uri,
             data=file_handle,
             headers=headers,
-            status_response={"200": lambda resp: resp},
+            status_response=_RAW_RESPONSE,
         )
         return upload_id
 
@@ -1100,34 +1329,61 @@ class Connection(object):
 
         """
         route = self.get_route("get_data_zip", data_id=data_id)
-        req = self.get(route, status_response={"200": lambda resp: resp}, stream=True)
+        req = self.get(route, status_response=_RAW_RESPONSE, stream=True)
 
+        # Let urllib3 undo any transfer Content-Encoding while copying
+        req.raw.decode_content = True
         if file_path:
             with open(file_path, "wb") as f:
-                # Buffer download of data into memory with smaller chunk sizes
-                chunk_sz = 1024  # 1kb chunks
-                for chunk in req.iter_content(chunk_sz):
-                    if chunk:
-                        f.write(chunk)
+                shutil.copyfileobj(req.raw, f, _DOWNLOAD_CHUNK_SIZE)
             print(f"Zip file downloaded locally to {file_path}.")
         else:
-            return zipfile.ZipFile(io.BytesIO(req.content))
+            # Small zips are kept in memory, larger ones or those of unknown
+            # size go to an anonymous temporary file. SpooledTemporaryFile is
+            # not used as ZipFile requires `seekable()` before Python 3.11.
+            size = req.headers.get("Content-Length")
+            if size is not None and int(size) <= _IN_MEMORY_ZIP_MAX_SIZE:
+                buf = io.BytesIO()
+            else:
+                buf = tempfile.TemporaryFile()
+            shutil.copyfileobj(req.raw, buf, _DOWNLOAD_CHUNK_SIZE)
+            buf.seek(0)
+            return zipfile.ZipFile(buf)
 
     def get_route(self, method, **kwargs):
         """
         Helper function to automatically match and supply required arguments
         """
-        route_method = getattr(routes, method)
-        route_method_args, _, _, route_defaults = inspect.getargspec(route_method)
-        if route_defaults:
-            route_method_args = route_method_args[: -len(route_defaults)]
+        # Resolved routes only depend on `method`, `kwargs` and `env_args`, so
+        # they are memoized until the environment changes
+        self._sync_env()
+        try:
+            cache_key = (method, tuple(sorted(kwargs.items())))
+            return self._route_cache[cache_key]
+        except KeyError:
+            pass
+        except TypeError:
+            # Unhashable arguments are resolved without caching
+            return self._resolve_route(method, **kwargs)
+        route = self._resolve_route(method, **kwargs)
+        if len(self._route_cache) >= _ROUTE_CACHE_MAXSIZE:
+            self._route_cache.clear()
+        self._route_cache[cache_key] = route
+        return route
+
+    def _resolve_route(self, method, **kwargs):
+        """Formats the route `method` with `kwargs` and the environment args"""
+        route_method, route_method_args = _route_spec(method)
         # Update loaded argument dict with new arguments which are not None
-        new_args = {k: v for k, v in list(kwargs.items()) if v is not None}
+        new_args = {k: v for k, v in kwargs.items() if v is not None}
         arg_dict = dict(self.env_args, **new_args)
         input_args = []
         for arg in route_method_args:
-            if arg_dict[arg]:
-                input_args.append(arg_dict[arg])
+            value = arg_dict.get(arg)
+            # Falsy values such as 0 are valid, but an empty string would
+            # silently produce a malformed url
+            if value is not None and value != "":
+                input_args.append(value)
             else:
                 raise Exception(
                     f"For route: {method}, argument {arg} needs to be provided."
@@ -1161,52 +1417,67 @@ class Connection(object):
         )
 
     def _handle_response(self, response, **kwargs):
-        unauthorized_resp = (
-            "You are not authorized to execute this command. "
-            "For more information on access "
-            "permissions see the package documentation."
-        )
-        internal_error_resp = (
-            "An internal server error has occurred. "
-            "Please contact support for assistance."
-        )
-        default_status_response = {
-            "200": lambda resp: resp.json(),
-            "201": lambda resp: resp.json(),
-            "401": lambda resp: PermissionError(
-                "[%d] %s" % (resp.status_code, unauthorized_resp)
-            ),
-            "403": lambda resp: PermissionError(
-                "[%d] %s" % (resp.status_code, unauthorized_resp)
-            ),
-            "500": lambda resp: Exception(
-                "[%d] %s" % (resp.status_code, internal_error_resp)
-            ),
-            "default": lambda resp: Exception(
-                "[%d] %s" % (resp.status_code, resp.text)
-            ),
-        }
-        status_response = dict(default_status_response, **kwargs)
-
-        return_val = status_response.get(
-            str(response.status_code), status_response["default"]
+        status_code = str(response.status_code)
+        return_val = (
+            kwargs.get(status_code)
+            or _DEFAULT_STATUS_RESPONSE.get(status_code)
+            or kwargs.get("default")
+            or _DEFAULT_STATUS_RESPONSE["default"]
         )
 
-        if isinstance(return_val(response), Exception):
-            raise return_val(response)
+        # Handlers typically parse the response body, so only invoke them once
+        result = return_val(response)
+        if isinstance(result, Exception):
+            raise result
         else:
-            return return_val(response)
+            return result
 
     # NOTE(meawoppl) This is only called externally
     def _post_analytics(self, client_id=None, event_action=None, event_category="cli"):
         route = "https://www.google-analytics.com/collect"
         if not client_id:
             client_id = self.user_id
-        packet = (
-            f"v=1&tid=UA-28937242-7&cid={client_id}&t=event&"
-            f"ea={event_action}&ec={event_category}"
-        )
-        requests.post(route, packet)
+        packet = {
+            "v": 1,
+            "tid": "UA-28937242-7",
+            "cid": client_id,
+            "t": "event",
+            "ea": event_action,
+            "ec": event_category,
+        }
+        try:
+            _analytics_session().post(route, data=packet, timeout=1)
+        except requests.exceptions.RequestException:
+            # Analytics are best effort and must never interrupt a command
+            pass
+
+
+_UNAUTHORIZED_RESP = (
+    "You are not authorized to execute this command. "
+    "For more information on access "
+    "permissions see the package documentation."
+)
+_INTERNAL_ERROR_RESP = (
+    "An internal server error has occurred. Please contact support for assistance."
+)
+
+# Handlers used by `Connection._handle_response` for status codes which are not
+# overridden by the caller's `status_response`
+_DEFAULT_STATUS_RESPONSE = {
+    "200": lambda resp: resp.json(),
+    "201": lambda resp: resp.json(),
+    "401": lambda resp: PermissionError(
+        "[%d] %s" % (resp.status_code, _UNAUTHORIZED_RESP)
+    ),
+    "403": lambda resp: PermissionError(
+        "[%d] %s" % (resp.status_code, _UNAUTHORIZED_RESP)
+    ),
+    "500": lambda resp: Exception("[%d] %s" % (resp.status_code, _INTERNAL_ERROR_RESP)),
+    "default": lambda resp: Exception("[%d] %s" % (resp.status_code, resp.text)),
+}
+
+# `status_response` for calls which need the `requests.Response` itself
+_RAW_RESPONSE = {"200": lambda resp: resp}
 
 
 class AnalysisException(Exception):
@@ -1217,6 +1488,52 @@ class AnalysisException(Exception):
         return self.message
 
 
+def _file_size(file_handle):
+    """
+    Number of bytes left to be read from `file_handle`, or 0 when that cannot
+    be determined, e.g. for pipes or readers without `tell`
+    """
+    try:
+        position = file_handle.tell()
+    except (AttributeError, OSError):
+        return 0
+    try:
+        return os.fstat(file_handle.fileno()).st_size - position
+    except (AttributeError, OSError):
+        # In-memory buffers have no file descriptor
+        pass
+    try:
+        end = file_handle.seek(0, io.SEEK_END)
+        file_handle.seek(position)
+        return end - position
+    except (AttributeError, OSError):
+        return 0
+
+
+class _Utf8Reader(object):
+    """
+    Read-only binary view of a text buffer which encodes it to utf-8 one chunk
+    at a time, rather than holding a full encoded copy in memory. Its length is
+    known up front so requests sends a Content-Length rather than chunking.
+    """
+
+    def __init__(self, text_handle, chunk_size=_UPLOAD_CHUNK_SIZE):
+        self._handle = text_handle
+        self._chunk_size = chunk_size
+        start = text_handle.tell()
+        self._length = sum(len(chunk) for chunk in self)
+        text_handle.seek(start)
+
+    def __len__(self):
+        return self._length
+
+    def __iter__(self):
+        return iter(lambda: self.read(self._chunk_size), b"")
+
+    def read(self, size=-1):
+        return self._handle.read(size).encode("utf-8")
+
+
 def _parse_protocol(protocol):
     if isinstance(protocol, dict):
         return protocol
@@ -1,20 +1,24 @@
-import ast
+import functools
 import json
 import re
 
-from collections import OrderedDict
+from collections import OrderedDict, defaultdict, deque
 
 
-PLURAL_UNITS = [
-    "microliter",
-    "nanoliter",
-    "milliliter",
-    "second",
-    "minute",
-    "hour",
-    "g",
-    "nanometer",
-]
+PLURAL_UNITS = frozenset(
+    [
+        "microliter",
+        "nanoliter",
+        "milliliter",
+        "second",
+        "minute",
+        "hour",
+        "g",
+        "nanometer",
+    ]
+)
+
+_DIGITS = re.compile(r"\d+")
 
 TEMP_DICT = {
     "cold_20": "-20 degrees celsius",
@@ -26,37 +30,157 @@ TEMP_DICT = {
 }
 
 
+def _require_str(value):
+    """
+    Raises the AttributeError a str method would raise for a non-string
+    `value`, so malformed fields fail the same way before reaching a cache
+    """
+    if not isinstance(value, str):
+        raise AttributeError(f"{type(value).__name__!r} object is not a string")
+
+
+# The same well references and quantities recur throughout a protocol, so the
+# `AutoprotocolParser` helpers below are memoized
+@functools.lru_cache(maxsize=1024)
+def _platename(ref):
+    return ref.partition("/")[0]
+
+
+@functools.lru_cache(maxsize=1024)
+def _well(ref):
+    return ref.partition("/")[2]
+
+
+@functools.lru_cache(maxsize=1024)
+def _unit(u):
+    value, _, unit = u.partition(":")
+    if unit in PLURAL_UNITS and float(value) > 1:
+        unit += "s"
+    return f"{value} {unit}"
+
+
+def _longest_repeated_substring(string):
+    """
+    Longest substring occurring at least twice in `string` without overlapping,
+    the earliest one on ties. Returns an empty string if there is none.
+
+    Having two non-overlapping occurrences is preserved when shortening a
+    substring, so the length is found by bisection with each candidate length
+    checked in a single pass over `string`.
+    """
+
+    def first_repeat(length):
+        # Start of the earliest substring of `length` which occurs again at
+        # least `length` characters after its first occurrence
+        first = dict()
+        best = None
+        for start in range(len(string) - length + 1):
+            first_start = first.setdefault(string[start : start + length], start)
+            if start - first_start >= length and (best is None or first_start < best):
+                best = first_start
+                if best == 0:
+                    # nothing can repeat any earlier
+                    break
+        return best
+
+    low, high, match = 1, len(string) // 2, ""
+    while low <= high:
+        length = (low + high) // 2
+        start = first_repeat(length)
+        if start is None:
+            high = length - 1
+        else:
+            match = string[start : start + length]
+            low = length + 1
+    return match
+
+
 class AutoprotocolParser(object):
-    def __init__(self, protocol_obj, api=None, parsed_output=None):
+    # Autoprotocol instructions which have an English description, each is
+    # handled by the method of the same name
+    OPS = (
+        "absorbance",
+        "acoustic_transfer",
+        "autopick",
+        "cover",
+        "dispense",
+        "flash_freeze",
+        "fluorescence",
+        "gel_separate",
+        "gel_purify",
+        "incubate",
+        "image_plate",
+        "luminescence",
+        "oligosynthesize",
+        "provision",
+        "sanger_sequence",
+        "illumina_sequence",
+        "flow_analyze",
+        "seal",
+        "spin",
+        "spread",
+        "stamp",
+        "thermocycle",
+        "pipette",
+        "magnetic_transfer",
+        "measure_volume",
+        "measure_mass",
+        "measure_concentration",
+        "uncover",
+        "unseal",
+    )
+
+    def __init__(self, protocol_obj, api=None, parsed_output=None, file=None):
         self.api = api
         self.resource = dict()
-        self.parse(protocol_obj)
+        self._ops = {op: getattr(self, op) for op in self.OPS}
+        self.parse(protocol_obj, file=file)
+
+    def parse(self, obj, file=None):
+        """
+        Parses the instructions of `obj` into `parsed_output` and writes them
+        as a numbered list to `file`, which defaults to stdout
+        """
+        self.parsed_output = list(self.iter_parsed(obj))
+        if self.parsed_output:
+            print(
+                "\n".join(f"{i + 1}. {p}" for i, p in enumerate(self.parsed_output)),
+                file=file,
+            )
 
-    def parse(self, obj):
+    def iter_parsed(self, obj):
+        """
+        Yields the English description of each instruction of `obj` as it is
+        parsed, without buffering the whole protocol. `object_list` is rebuilt
+        along the way.
+        """
         self.object_list = []
         self.instructions = obj["instructions"]
 
-        parsed_output = []
+        ops = self._ops
         for i in self.instructions:
+            op = ops.get(i["op"])
+            if op is None:
+                yield "[Unknown instruction]"
+                continue
             try:
-                output = getattr(self, i["op"])(i)
-                parsed_output.extend(output) if isinstance(
-                    output, list
-                ) else parsed_output.append(output)
+                output = op(i)
             except AttributeError:
-                parsed_output.append("[Unknown instruction]")
-
-        self.parsed_output = parsed_output
-        for i, p in enumerate(parsed_output):
-            print("%d. %s" % (i + 1, p))
+                # Malformed fields, such as a non-string volume
+                yield "[Unknown instruction]"
+                continue
+            if isinstance(output, list):
+                yield from output
+            else:
+                yield output
 
-    def job_tree(self):
+    def job_tree(self, file=None):
         """
         A Job Tree visualizes the instructions of a protocol in a hierarchical
         structure based on container dependency to help human readers with manual
         execution. Its construction utilizes the algorithm below, as well as the
         Node object class (to store relational information) at the bottom of this
-        script.
+        script. The tree is written to `file`, which defaults to stdout.
 
         Example Usage:
             .. code-block:: python
@@ -125,58 +249,42 @@ class AutoprotocolParser(object):
 
         # 2. Convert steps to list of node objects (0,1,2,3...)
         def assign_nodes(steps):
-            nodes = [i for i in range(len(steps))]
-            objects = list(set([elem for sublist in steps for elem in sublist]))
+            # populate with leafless trees (Node objects, no edges) named by
+            # their step index
+            nodes = [Node(i) for i in range(len(steps))]
 
             # checks for multiple src and dst objects -- added when looking for
             # mutiples
-            split_objects = []
-            for obj in objects:
-                if len(obj) > 1:
-                    new_objs = obj.split(", ")
-                    split_objects.extend(new_objs)
-                else:
-                    split_objects.append(obj)
-            objects = split_objects
-            del split_objects
-
-            # populate with leafless trees (Node objects, no edges)
-            for node in nodes:
-                nodes[node] = Node(str(node))
+            objects = set()
+            for sublist in steps:
+                for elem in sublist:
+                    objects.update(elem.split(", "))
+
+            # index the steps using each object: steps with a single object
+            # string match objects exactly, while strings listing multiple
+            # src/dst objects match any object they contain
+            exact_steps = defaultdict(set)
+            multiple_objects = []
+            for i, sublist in enumerate(steps):
+                for string in sublist:
+                    if "," in string:
+                        multiple_objects.append((i, string))
+                if any("," not in string for string in sublist):
+                    for string in sublist:
+                        exact_steps[string].add(i)
 
             # search for leafy trees
             for obj in objects:
 
                 # accounts for multiple drc/dst objects
-                leaves = []
-                for i, sublist in enumerate(steps):
-                    for string in sublist:
-                        if string.count(",") > 0:
-                            if obj in string:
-                                leaves.append(i)
-                        else:
-                            if obj in sublist:
-                                leaves.append(i)
-                leaves = sorted(list(set(leaves)))
-
-                if len(leaves) > 1:
-                    viable_edges = []
-
-                    # compute cross-product
-                    for leaf1 in leaves:
-                        for leaf2 in leaves:
-                            if (
-                                str(leaf1) != str(leaf2)
-                                and sorted((leaf1, leaf2)) not in viable_edges
-                            ):
-                                viable_edges.append(sorted((leaf1, leaf2)))
-
-                    # form edge networks
-                    for edge in viable_edges:
-                        n1, n2 = nodes[edge[0]], nodes[edge[1]]
-                        n1.add_edge(n2)
-                        n2.add_edge(n1)
-                        nodes[int(n1.name)], nodes[int(n2.name)] = n1, n2
+                leaves = set(exact_steps.get(obj, ()))
+                leaves.update(i for i, string in multiple_objects if obj in string)
+                leaves = sorted(leaves)
+
+                # connect every step using the object, connected_nodes only
+                # needs connectivity so a star rooted at the first step suffices
+                for leaf in leaves[1:]:
+                    nodes[leaves[0]].add_edge(nodes[leaf])
             return nodes
 
         # 3. Determine number of trees and regroup by connected nodes
@@ -187,11 +295,10 @@ class AutoprotocolParser(object):
             while nodes:
                 n = nodes.pop()
                 group = {n}
-                queue = [n]
+                queue = deque([n])
                 while queue:
-                    n = queue.pop(0)
-                    neighbors = n.edges
-                    neighbors.difference_update(group)
+                    n = queue.popleft()
+                    neighbors = n.edges - group
                     nodes.difference_update(neighbors)
                     group.update(neighbors)
                     queue.extend(neighbors)
@@ -205,15 +312,20 @@ class AutoprotocolParser(object):
             # node sorting in trees
             sorted_trees = []
             for tree in trees:
-                sorted_trees.append(sorted(tree, key=lambda x: int(x.name)))
+                sorted_trees.append(sorted(tree, key=lambda x: x.name))
 
             # retrieve values of the nodes (the protocol's containers)
             # for each tree ... may want to use dictionary eventually
             all_values = []
             for tree in sorted_trees:
-                values = [steps[int(node.name)] for node in tree]
+                values = [steps[node.name] for node in tree]
                 all_values.append(values)
 
+            # steps indexed by their first object
+            steps_by_first = defaultdict(list)
+            for i, sublist in enumerate(steps):
+                steps_by_first[sublist[0]].append(i)
+
             # create relational tuples:
             all_digs = []
             singles = []
@@ -227,7 +339,7 @@ class AutoprotocolParser(object):
                     digs = []
                     dst_nodes = []
                     node_values = all_values[tree_idx][node_idx]
-                    src_node = str(sorted_trees[tree_idx][node_idx].name)
+                    src_node = sorted_trees[tree_idx][node_idx].name
 
                     # ACTION ON MULTIPLE OBJECTS (E.G. TRANSFER FROM SRC -> DST
                     # WELLS)
@@ -235,30 +347,24 @@ class AutoprotocolParser(object):
                     if len(node_values) == 2:
                         # single destination (x-1)
                         if node_values[1].count(",") == 0:
-                            dst_nodes = [
-                                i
-                                for i, sublist in enumerate(steps)
-                                if node_values[1] == sublist[0]
-                            ]
+                            dst_nodes = steps_by_first.get(node_values[1], [])
                         # multiple destinations (x-many)
                         elif node_values[1].count(",") > 0:
-                            dst_nodes = []
-                            for dst in node_values[1].replace(", ", ""):
-                                for i, sublist in enumerate(steps):
-                                    if i not in dst_nodes and dst == sublist[0]:
-                                        dst_nodes.append(i)
+                            dst_nodes = list(
+                                dict.fromkeys(
+                                    i
+                                    for dst in node_values[1].replace(", ", "")
+                                    for i in steps_by_first.get(dst, ())
+                                )
+                            )
 
                     # ACTION ON A SINGLE OBJECT
                     elif len(node_values) == 1:
-                        dst_nodes = [
-                            i
-                            for i, sublist in enumerate(steps)
-                            if node_values[0] == sublist[0]
-                        ]
+                        dst_nodes = steps_by_first.get(node_values[0], [])
 
                     # Constructing tuples in (child, parent) format
                     for dst_node in dst_nodes:
-                        dig = (int(dst_node), int(src_node))
+                        dig = (dst_node, src_node)
                         digs.append(dig)
 
                     # else: an edge-case for dictionaries constructed with no edges
@@ -268,16 +374,16 @@ class AutoprotocolParser(object):
                         tree_digs.append(digs)
                     else:
                         edge_flag = True
-                        digs = [(int(src_node), int(src_node))]
+                        digs = [(src_node, src_node)]
                         tree_digs.append(digs)
 
                 # digraph cycle detection: avoids cycles by overlooking set
                 # repeats
-                true_tree_digs = []
-                for digs in tree_digs:
-                    for dig in digs:
-                        if tuple(sorted(dig, reverse=True)) not in true_tree_digs:
-                            true_tree_digs.append(tuple(sorted(dig, reverse=True)))
+                true_tree_digs = list(
+                    dict.fromkeys(
+                        (max(dig), min(dig)) for digs in tree_digs for dig in digs
+                    )
+                )
 
                 # edge-case for dictionaries constructed with no edges
                 if true_tree_digs != [] and edge_flag == False:
@@ -321,43 +427,27 @@ class AutoprotocolParser(object):
         # 5. Convert dictionary-stored nodes to unflattened, nested list of
         # parent-children relations
         def dict_to_list(forest):
+            # nested [id, *children] lists, subtrees shared between parents
+            # are repeated under each of them
+            def branch(node):
+                return [node["id"]] + [
+                    branch(child) for child in node.get("children", ())
+                ]
+
             forest_list = []
             for tree in forest:
-                tString = str(json.dumps(tree))
-                tString = (
-                    tString.replace('"id": ', "")
-                    .replace('"children": ', "")
-                    .replace("[{", "[")
-                    .replace("}]", "]")
-                    .replace("{", "[")
-                    .replace("}", "]")
-                )
+                tString = str(branch(tree))
 
                 # find largest repeated branch (if applicable)
-                # maybe think about using prefix trees or SIMD extensions for better
-                # efficiency
-                x, y, length, match = 0, 0, 0, ""
-                for y in range(len(tString)):
-                    for x in range(len(tString)):
-                        substring = tString[y:x]
-                        if (
-                            len(list(re.finditer(re.escape(substring), tString))) > 1
-                            and len(substring) > length
-                        ):
-                            match = substring
-                            length = len(substring)
+                match = _longest_repeated_substring(tString)
 
                 # checking for legitimate branch repeat
                 if "[" in match and "]" in match:
                     hits = []
-                    index = 0
                     if len(tString) > 3:
-                        while index < len(tString):
-                            index = tString.find(str(match), index)
-                            if index == -1:
-                                break
-                            hits.append(index)
-                            index += len(match)
+                        hits = [
+                            m.start() for m in re.finditer(re.escape(match), tString)
+                        ]
 
                     # find all locations of repeated branch and remove
                     if len(hits) > 1:
@@ -367,33 +457,21 @@ class AutoprotocolParser(object):
                             )
 
                 # increment all numbers in string to match the protocol
-                newString = ""
-                numString = ""
-                for el in tString:
-                    if el.isdigit():  # build number
-                        numString += el
-                    else:
-                        if (
-                            numString != ""
-                        ):  # convert it to int and reinstantaite numString
-                            numString = str(int(numString) + 1)
-                        newString += numString
-                        newString += el
-                        numString = ""
-                tString = newString
-                del newString
-
-                forest_list.append(ast.literal_eval(tString))
+                tString = _DIGITS.sub(lambda m: str(int(m.group()) + 1), tString)
+                # nested lists of ints read the same as JSON, which parses
+                # far faster than ast.literal_eval
+                forest_list.append(json.loads(tString))
             return forest_list
 
-        # 6. Print job tree(s)
-        def print_tree(lst, level=0):
-            print("    " * (level - 1) + "+---" * (level > 0) + str(lst[0]))
+        # 6. Format job tree(s) as indented lines
+        def tree_lines(lst, lines, level=0):
+            lines.append("    " * (level - 1) + "+---" * (level > 0) + str(lst[0]))
             for l in lst[1:]:
                 if isinstance(l, list):
-                    print_tree(l, level + 1)
+                    tree_lines(l, lines, level + 1)
                 else:
-                    print("    " * level + "+---" + l)
+                    lines.append("    " * level + "+---" + str(l))
+            return lines
 
         # 1
         steps = depth_one(self.object_list)
@@ -406,9 +484,10 @@ class AutoprotocolParser(object):
         # 5
         self.forest_list = dict_to_list(forest)
         # 6
-        print("\n" + "A suggested Job Tree based on container dependency: \n")
+        lines = ["\nA suggested Job Tree based on container dependency: \n"]
         for tree_list in self.forest_list:
-            print_tree(tree_list)
+            tree_lines(tree_list, lines)
+        print("\n".join(lines), file=file)
 
     def absorbance(self, opts):
         self.object_list.append([opts["object"]])
@@ -430,22 +509,16 @@ class AutoprotocolParser(object):
     def autopick(self, opts):
         picks = []
         for i, g in enumerate(opts["groups"]):
-            picks.extend(
-                [
-                    "Pick %s colonies from %s %s: %s to %s, %s"
-                    % (
-                        len(g["to"]),
-                        len(g["from"]),
-                        ("well" if len(g["from"]) == 1 else "wells"),
-                        self.well_list(g["from"]),
-                        self.well_list(g["to"]),
-                        (
-                            f"data saved at '{opts['dataref']}'"
-                            if i == 0
-                            else "analyzed with previous"
-                        ),
-                    )
-                ]
+            n_from = len(g["from"])
+            data = (
+                f"data saved at '{opts['dataref']}'"
+                if i == 0
+                else "analyzed with previous"
+            )
+            picks.append(
+                f"Pick {len(g['to'])} colonies from {n_from} "
+                f"{'well' if n_from == 1 else 'wells'}: "
+                f"{self.well_list(g['from'])} to {self.well_list(g['to'])}, {data}"
             )
             self.object_list.append([g["from"], g["to"]])
         return picks
@@ -456,26 +529,13 @@ class AutoprotocolParser(object):
 
     def dispense(self, opts):
         self.object_list.append([opts["object"]])
-        unique_vol = []
-        for col in opts["columns"]:
-            vol = self.unit(col["volume"])
-            if vol not in unique_vol:
-                unique_vol.append(vol)
+        unique_vol = list(
+            dict.fromkeys(self.unit(col["volume"]) for col in opts["columns"])
+        )
         if "reagent" in opts:
             reagent = opts["reagent"]
         elif "resource_id" in opts:
-            resource_id = opts["resource_id"]
-            if resource_id in self.resource:
-                reagent = self.resource[resource_id]
-            elif self.api:
-                resource = self.api.resources(resource_id)
-                if resource["results"]:
-                    reagent = resource["results"][0]["name"].lower()
-                    self.resource[resource_id] = reagent
-                else:
-                    reagent = f"resource with resource ID {resource_id}"
-            else:
-                reagent = f"resource with resource ID {resource_id}"
+            reagent = self._resource_name(opts["resource_id"])
         else:
             reagent = "unknown"
 
@@ -485,10 +545,9 @@ class AutoprotocolParser(object):
                 f"of {opts['object']}"
             )
         else:
-            return "Dispense corresponding amounts of %s to %d column(s) of %s" % (
-                reagent,
-                len(opts["columns"]),
-                opts["object"],
+            return (
+                f"Dispense corresponding amounts of {reagent} to "
+                f"{len(opts['columns'])} column(s) of {opts['object']}"
             )
 
     def flash_freeze(self, opts):
@@ -508,32 +567,27 @@ class AutoprotocolParser(object):
         self.object_list.append([opts["matrix"]])
         return (
             f"Perform gel electrophoresis using a "
-            f"{opts['matrix'].split(',')[1][:-1]} agarose gel for "
+            f"{self.matrix_name(opts['matrix'])} agarose gel for "
             f"{self.unit(opts['duration'])}"
         )
 
     def gel_purify(self, opts):
         self.object_list.append([opts["matrix"]])
-        unique_bl = []
-        for ext in opts["extract"]:
-            bl = ext["band_size_range"]
-            if bl not in unique_bl:
-                unique_bl.append(bl)
-        for i in range(len(unique_bl)):
-            unique_bl[i] = (
-                str(unique_bl[i]["min_bp"]) + "-" + str(unique_bl[i]["max_bp"])
-            )
+        band_ranges = (ext["band_size_range"] for ext in opts["extract"])
+        unique_bl = list(
+            dict.fromkeys(f"{bl['min_bp']}-{bl['max_bp']}" for bl in band_ranges)
+        )
 
         if len(unique_bl) <= 3:
             return (
                 f"Perform gel purification on the "
-                f"{opts['matrix'].split(',')[1][:-1]} agarose gel with "
+                f"{self.matrix_name(opts['matrix'])} agarose gel with "
                 f"band range(s) {', '.join(unique_bl)}"
             )
         else:
             return (
                 f"Perform gel purification on the "
-                f"{opts['matrix'].split(',')[1][:-1]} agarose gel with "
+                f"{self.matrix_name(opts['matrix'])} agarose gel with "
                 f"{len(unique_bl)} band ranges"
             )
 
@@ -542,7 +596,7 @@ class AutoprotocolParser(object):
         shaking = " (shaking)" if opts["shaking"] else ""
         return (
             f"Incubate {opts['object']} at "
-            f"{TEMP_DICT[opts['where']]} for "
+            f"{TEMP_DICT.get(opts['where'], opts['where'])} for "
             f"{self.unit(opts['duration'])}{shaking}"
         )
 
@@ -558,33 +612,27 @@ class AutoprotocolParser(object):
         )
 
     def oligosynthesize(self, opts):
-        self.object_list.append([o["destination"] for o in opts["oligos"]])
-        return [
-            f"Oligosynthesize sequence '{o['sequence']}' into " f"'{o['destination']}'"
-            for o in opts["oligos"]
-        ]
+        destinations, oligos = [], []
+        for o in opts["oligos"]:
+            destinations.append(o["destination"])
+            oligos.append(
+                f"Oligosynthesize sequence '{o['sequence']}' into '{o['destination']}'"
+            )
+        self.object_list.append(destinations)
+        return oligos
 
     def provision(self, opts):
-        self.object_list.append([self.platename(t["well"]) for t in opts["to"]])
-        resource_id = opts["resource_id"]
-        if resource_id in self.resource:
-            reagent = self.resource[resource_id]
-        elif self.api:
-            resource = self.api.resources(resource_id)
-            if resource["results"]:
-                reagent = resource["results"][0]["name"].lower()
-                self.resource[resource_id] = reagent
-            else:
-                reagent = f"resource with resource ID {resource_id}"
-        else:
-            reagent = f"resource with resource ID {resource_id}"
-        provisions = []
+        reagent = self._resource_name(opts["resource_id"])
+        plates, provisions = [], []
         for t in opts["to"]:
+            plate = self.platename(t["well"])
+            plates.append(plate)
             provisions.append(
                 f"Provision {self.unit(t['volume'])} of "
                 f"{reagent} to well {self.well(t['well'])} of "
-                f"container {self.platename(t['well'])}"
+                f"container {plate}"
             )
+        self.object_list.append(plates)
         return provisions
 
     def sanger_sequence(self, opts):
@@ -596,7 +644,7 @@ class AutoprotocolParser(object):
         if opts["type"] == "standard":
             return seq
         elif opts["type"] == "rca":
-            return seq + " with %s" % self.platename(opts["primer"])
+            return f"{seq} with {self.platename(opts['primer'])}"
 
     def illumina_sequence(self, opts):
         unique_wells = self.get_unique_wells(opts["lanes"])
@@ -604,28 +652,27 @@ class AutoprotocolParser(object):
         self.object_list.append(unique_plates)
 
         if len(unique_plates) == 1 and len(unique_wells) <= 3:
-            seq = "Illumina sequence wells %s" % (", ".join(unique_wells))
+            seq = f"Illumina sequence wells {', '.join(unique_wells)}"
         elif len(unique_plates) > 1 and len(unique_plates) <= 3:
-            seq = "Illumina sequence the corresponding wells of plates %s" % ", ".join(
-                unique_plates[0]
+            seq = (
+                "Illumina sequence the corresponding wells of plates "
+                f"{', '.join(unique_plates)}"
             )
         else:
-            seq = "Illumina sequence the corresponding wells of %s plates" % len(
-                unique_wells
+            seq = (
+                "Illumina sequence the corresponding wells of "
+                f"{len(unique_wells)} plates"
             )
 
         return seq + f" with library size {opts['library_size']}"
 
     def flow_analyze(self, opts):
-        wells = []
-        for sample in opts["samples"]:
-            if sample["well"] not in wells:
-                wells.append(sample["well"])
+        wells = list(dict.fromkeys(sample["well"] for sample in opts["samples"]))
         self.object_list.append([self.platename(w) for w in wells])
 
         return (
-            "Perform flow cytometry on %s with the respective FSC and SSC channel parameters"
-            % ", ".join(wells)
+            f"Perform flow cytometry on {', '.join(wells)} with the respective FSC "
+            "and SSC channel parameters"
         )
 
     def seal(self, opts):
@@ -651,36 +698,20 @@ class AutoprotocolParser(object):
     def stamp(self, opts):
         stamps = []
         for g in opts["groups"]:
-            for pip in g:
-                if pip == "transfer":
-                    stamps.extend(
-                        [
-                            "Stamp %s from source origin %s "
-                            "to destination origin %s %s (%s)"
-                            % (
-                                self.unit(p["volume"]),
-                                p["from"],
-                                p["to"],
-                                (
-                                    "with the same set of tips as previous"
-                                    if (len(g[pip]) > 1 and i > 0)
-                                    else ""
-                                ),
-                                (
-                                    "%s rows x %s columns"
-                                    % (g["shape"]["rows"], g["shape"]["columns"])
-                                ),
-                            )
-                            for i, p in enumerate(g[pip])
-                        ]
-                    )
-                    from_objs = str(
-                        [self.platename(p["from"]) for i, p in enumerate(g[pip])]
-                    )
-                    to_objs = str(
-                        [self.platename(p["to"]) for i, p in enumerate(g[pip])]
-                    )
-                    self.object_list.append([from_objs, to_objs])
+            if "transfer" not in g:
+                continue
+            shape = f"{g['shape']['rows']} rows x {g['shape']['columns']} columns"
+            from_objs, to_objs = [], []
+            for i, p in enumerate(g["transfer"]):
+                stamps.append(
+                    f"Stamp {self.unit(p['volume'])} from source origin "
+                    f"{p['from']} to destination origin {p['to']} "
+                    f"{'with the same set of tips as previous' if i else ''} "
+                    f"({shape})"
+                )
+                from_objs.append(self.platename(p["from"]))
+                to_objs.append(self.platename(p["to"]))
+            self.object_list.append([str(from_objs), str(to_objs)])
         return stamps
 
     def thermocycle(self, opts):
@@ -690,48 +721,40 @@ class AutoprotocolParser(object):
     def pipette(self, opts):
         pipettes = []
         for g in opts["groups"]:
-            for pip in g:
+            for pip, spec in g.items():
                 if pip == "mix":
-                    for m in g[pip]:
+                    for m in spec:
+                        plate = self.platename(m["well"])
                         pipettes.append(
-                            "Mix well %s of plate %s %d times "
-                            "with a volume of %s"
-                            % (
-                                self.well(m["well"]),
-                                self.platename(m["well"]),
-                                m["repetitions"],
-                                self.unit(m["volume"]),
-                            )
+                            f"Mix well {self.well(m['well'])} of plate {plate} "
+                            f"{int(m['repetitions'])} times "
+                            f"with a volume of {self.unit(m['volume'])}"
                         )
-                        self.object_list.append(self.platename(m["well"]))
+                        self.object_list.append(plate)
                 elif pip == "transfer":
-                    pipettes.extend(
-                        [
-                            f"Transfer {self.unit(p['volume'])} from {p['from']} to {p['to']} {'with the same tip as previous' if len(g[pip]) > 1 and i > 0 else ''}"
-                            for i, p in enumerate(g[pip])
-                        ]
-                    )
-
-                    from_objs = str(
-                        [self.platename(p["from"]) for i, p in enumerate(g[pip])]
-                    )
-                    to_objs = str(
-                        [self.platename(p["to"]) for i, p in enumerate(g[pip])]
-                    )
-                    self.object_list.append([from_objs, to_objs])
+                    from_objs, to_objs = [], []
+                    for i, p in enumerate(spec):
+                        pipettes.append(
+                            f"Transfer {self.unit(p['volume'])} from {p['from']} "
+                            f"to {p['to']} "
+                            f"{'with the same tip as previous' if i else ''}"
+                        )
+                        from_objs.append(self.platename(p["from"]))
+                        to_objs.append(self.platename(p["to"]))
+                    self.object_list.append([str(from_objs), str(to_objs)])
                 elif pip == "distribute":
+                    wells = [d["well"] for d in spec["to"]]
                     pipettes.append(
-                        f"Distribute from {g[pip]['from']} into "
-                        f"{self.well_list([d['well'] for d in g[pip]['to']], 20)}"
+                        f"Distribute from {spec['from']} into "
+                        f"{self.well_list(wells, 20)}"
                     )
-                    self.object_list.append([g[pip]["from"], g[pip]["to"][0]["well"]])
+                    self.object_list.append([spec["from"], wells[0]])
                 elif pip == "consolidate":
+                    wells = [c["well"] for c in spec["from"]]
                     pipettes.append(
-                        f"Consolidate "
-                        f"{self.well_list([c['well'] for c in g[pip]['from']], 20)} "
-                        f"into {g[pip]['to']}"
+                        f"Consolidate {self.well_list(wells, 20)} into {spec['to']}"
                     )
-                    self.object_list.append([g[pip]["from"][0]["well"], g[pip]["to"]])
+                    self.object_list.append([wells[0], spec["to"]])
         return pipettes
 
     def magnetic_transfer(self, opts):
@@ -741,7 +764,7 @@ class AutoprotocolParser(object):
         seq = f"Magnetically {specific_op} {specs_dict['object']}"
 
         if specific_op == "dry":
-            return seq + " for %s" % self.unit(specs_dict["duration"])
+            return f"{seq} for {self.unit(specs_dict['duration'])}"
         elif specific_op == "incubate":
             return (
                 seq + f" for {self.unit(specs_dict['duration'])} with a "
@@ -770,7 +793,7 @@ class AutoprotocolParser(object):
     def measure_mass(self, opts):
         unique_plates = self.get_unique_plates(opts["object"])
         self.object_list.append(unique_plates)
-        return "Measure mass of %s" % ", ".join(opts["object"])
+        return f"Measure mass of {', '.join(opts['object'])}"
 
     def measure_concentration(self, opts):
         unique_plates = self.get_unique_plates(opts["object"])
@@ -788,52 +811,55 @@ class AutoprotocolParser(object):
         self.object_list.append([opts["object"]])
         return f"Unseal {opts['object']}"
 
+    def _resource_name(self, resource_id):
+        """
+        Name of the resource with `resource_id`, looked up through the api at
+        most once per id. Falls back to describing the id without an api or if
+        the resource is not found.
+        """
+        if resource_id in self.resource:
+            return self.resource[resource_id]
+        reagent = f"resource with resource ID {resource_id}"
+        if self.api:
+            results = self.api.resources(resource_id)["results"]
+            if results:
+                reagent = results[0]["name"].lower()
+            self.resource[resource_id] = reagent
+        return reagent
+
     @staticmethod
     def platename(ref):
-        return ref.split("/")[0]
+        _require_str(ref)
+        return _platename(ref)
 
     @staticmethod
     def well(ref):
-        return ref.split("/")[1]
+        _require_str(ref)
+        return _well(ref)
+
+    @staticmethod
+    def matrix_name(matrix):
+        """Gel percentage of a matrix, e.g. 2.0% for agarose(96,2.0%)"""
+        return matrix.split(",", 2)[1][:-1]
 
     @staticmethod
     def get_unique_wells(list_of_wells):
-        unique_wells = []
-        for well in list_of_wells:
-            w = well["object"]
-            if w not in unique_wells:
-                unique_wells.append(w)
-        return unique_wells
+        return list(dict.fromkeys(well["object"] for well in list_of_wells))
 
     @staticmethod
     def get_unique_plates(list_of_wells):
-        unique_plates = []
-        for well in list_of_wells:
-            loc = well.find("/")
-            if loc == -1:
-                plate = well
-            else:
-                plate = well[:loc]
-
-            if plate not in unique_plates:
-                unique_plates.append(plate)
-        return unique_plates
+        return list(dict.fromkeys(well.split("/", 1)[0] for well in list_of_wells))
 
     @staticmethod
     def well_list(wells, max_len=10):
-        well_list = "wells " + (", ").join(str(x) for x in wells)
         if len(wells) > max_len:
-            well_list = str(len(wells)) + " wells"
-        return well_list
+            return f"{len(wells)} wells"
+        return "wells " + ", ".join(map(str, wells))
 
     @staticmethod
     def unit(u):
-        value = u.split(":")[0]
-        unit = u.split(":")[1]
-        return (
-            f"{value} "
-            f"{unit + 's' if float(value) > 1 and unit in PLURAL_UNITS else unit}"
-        )
+        _require_str(u)
+        return _unit(u)
 
 
 class Node(object):
@@ -862,13 +888,14 @@ class Node(object):
     ----------
     name: str
         Name the Node object
-    edges: set
+    edges: frozenset
         Set of edges that each node owns
     """
 
     def __init__(self, name):
         self.__name = name
         self.__links = set()
+        self.__edges = None
 
     @property
     def name(self):
@@ -876,8 +903,12 @@ class Node(object):
 
     @property
     def edges(self):
-        return set(self.__links)
+        # Immutable snapshot, rebuilt only after edges are added
+        if self.__edges is None:
+            self.__edges = frozenset(self.__links)
+        return self.__edges
 
     def add_edge(self, other):
         self.__links.add(other)
         other.__links.add(self)
+        self.__edges = other.__edges = None
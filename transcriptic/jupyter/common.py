@@ -1,3 +1,6 @@
+import weakref
+
+
 try:
     import pandas as pd
 except ImportError:
@@ -17,6 +20,23 @@ def _check_api(obj_type):
     return api
 
 
+# Listed objects indexed by name, title and id, kept per connection and keyed by
+# object type and organization
+_object_indexes = weakref.WeakKeyDictionary()
+
+
+def _index_objects(objects):
+    """Map the names, titles and ids of `objects` to their (id, name) matches"""
+    index = dict()
+    for obj in objects:
+        # Special case here since we use both 'name' and 'title' for object names
+        for field in ("name", "title"):
+            if field in obj:
+                for key in dict.fromkeys((obj[field], obj["id"])):
+                    index.setdefault(key, []).append((obj["id"], obj[field]))
+    return index
+
+
 class _BaseObject(object):
     """Base object which other objects inherit from"""
 
@@ -40,30 +60,41 @@ class _BaseObject(object):
                 self.attributes = attributes
 
     def load_object(self, obj_type, obj_id):
-        """Find and match object by name"""
+        """
+        Find and match object by name. Listings are indexed once per connection
+        and only listed again when `obj_id` is not found, so renamed or deleted
+        objects and new duplicate names are only noticed after `clear_cache`.
+        """
         # TODO: Remove the try/except statement and properly handle cases where objects
         #  are not found
         # TODO: Fix `datasets` route since that only returns non-analysis objects
         try:
-            objects = getattr(self.connection, obj_type + "s")()
-        except Exception:
-            return obj_id, str(obj_id)
-        matched_objects = []
-        for obj in objects:
-            # Special case here since we use both 'name' and 'title' for object names
-            if "name" in obj:
-                if obj_id == obj["name"] or obj_id == obj["id"]:
-                    matched_objects.append((obj["id"], obj["name"]))
-            if "title" in obj:
-                if obj_id == obj["title"] or obj_id == obj["id"]:
-                    matched_objects.append((obj["id"], obj["title"]))
-        if len(matched_objects) == 0:
+            cache_key = (obj_type, self.connection.organization_id)
+        except (AttributeError, ValueError):
+            cache_key = (obj_type, None)
+        indexes = _object_indexes.setdefault(self.connection, dict())
+        matched_objects = indexes.get(cache_key, {}).get(obj_id)
+        if not matched_objects:
+            # List the objects again, `obj_id` may have been created since
+            try:
+                objects = getattr(self.connection, obj_type + "s")()
+            except Exception:
+                return obj_id, str(obj_id)
+            indexes[cache_key] = _index_objects(objects)
+            matched_objects = indexes[cache_key].get(obj_id)
+        if not matched_objects:
             raise TypeError(f"{obj_id} is not found in your {obj_type}s.")
-        elif len(matched_objects) == 1:
-            return matched_objects[0]
-        else:
+        elif len(matched_objects) > 1:
             print(
                 f"More than 1 match found. Defaulting to the first match: "
                 f"{matched_objects[0]}"
             )
-            return matched_objects[0]
+        return matched_objects[0]
+
+    @staticmethod
+    def clear_cache():
+        """
+        Forget the object listings used to look up objects by name, so the next
+        lookup lists them again
+        """
+        _object_indexes.clear()
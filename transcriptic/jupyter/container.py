@@ -65,7 +65,10 @@ class Container(_BaseObject):
         Parameters
         ----------
         container_id: str
-            Container name or id in string form
+            Container name or id in string form. Names are resolved with a listing of
+            containers kept per connection, which is only listed again when a name is
+            not found. Call `Container.clear_cache()` to pick up containers renamed,
+            deleted or given a duplicate name since.
         attributes: Optional[dict]
             Attributes of the container
         connection: Optional[transcriptic.config.Connection]
@@ -117,51 +120,44 @@ class Container(_BaseObject):
 
         """
         if self._aliquots.empty:
-            aliquot_list = self.attributes["aliquots"]
+            aliquot_list = sorted(
+                self.attributes["aliquots"], key=itemgetter("well_idx")
+            )
+            volumes = pd.Series([float(x["volume_ul"]) for x in aliquot_list])
             try:
                 from autoprotocol import Unit
 
-                self._aliquots = pd.DataFrame(
-                    sorted(
-                        [
-                            dict(
-                                {
-                                    "Well Index": x["well_idx"],
-                                    "Name": x["name"],
-                                    "Id": x["id"],
-                                    "Volume": Unit(float(x["volume_ul"]), "microliter"),
-                                },
-                                **x["properties"],
-                            )
-                            for x in aliquot_list
-                        ],
-                        key=itemgetter("Well Index"),
-                    )
-                )
+                # map fills an object array directly, building a column from a
+                # list of Units makes pint strip their units
+                volumes = volumes.map(lambda volume: Unit(volume, "microliter"))
             except ImportError:
                 warnings.warn(
                     "Volume is not cast into Unit-type. Please install "
                     "`autoprotocol-python` in order to have automatic Unit casting"
                 )
-                self._aliquots = pd.DataFrame(
-                    sorted(
-                        [
-                            dict(
-                                {
-                                    "Well Index": x["well_idx"],
-                                    "Name": x["name"],
-                                    "Id": x["id"],
-                                    "Volume": float(x["volume_ul"]),
-                                },
-                                **x["properties"],
-                            )
-                            for x in aliquot_list
-                        ],
-                        key=itemgetter("Well Index"),
-                    )
-                )
-            indices = self._aliquots.pop("Well Index")
-            self._aliquots.set_index(indices, inplace=True)
+            # Build the frame column by column, aliquot properties follow the
+            # base columns in the order they first appear
+            columns = {
+                "Name": [x["name"] for x in aliquot_list],
+                "Id": [x["id"] for x in aliquot_list],
+                "Volume": volumes.to_numpy(),
+            }
+            for key in dict.fromkeys(
+                key for x in aliquot_list for key in x["properties"]
+            ):
+                # properties take precedence over base columns of the same name,
+                # aliquots without the property are NaN as in pd.DataFrame(records)
+                base = columns.get(key, [float("nan")] * len(aliquot_list))
+                columns[key] = [
+                    x["properties"].get(key, value)
+                    for x, value in zip(aliquot_list, base)
+                ]
+            self._aliquots = pd.DataFrame(
+                columns,
+                index=pd.Index(
+                    [x["well_idx"] for x in aliquot_list], name="Well Index"
+                ),
+            )
         return self._aliquots
 
     def __repr__(self):
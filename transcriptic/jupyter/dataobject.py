@@ -1,14 +1,37 @@
+import functools
 import json
+import shutil
 
-from io import StringIO
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
 
 import pandas as pd
 import requests
 
+from requests.adapters import HTTPAdapter
+
 from .common import _check_api
 from .container import Container
 
 
+# Connections kept open per host for data object downloads, which is also the
+# most concurrent downloads `init_from_dataset_id` runs
+_DOWNLOAD_POOL_SIZE = 16
+
+
+@functools.lru_cache(maxsize=None)
+def _download_session():
+    """
+    Session reused for downloading data object urls. It is kept apart from the
+    `Connection` session so credentials are never sent along to S3.
+    """
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_maxsize=_DOWNLOAD_POOL_SIZE)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
 class DataObject(object):
     """
     A DataObject holds a reference to the raw data, stored in S3, along with format and
@@ -86,13 +109,31 @@ class DataObject(object):
         return DataObject(data_object_id)
 
     @staticmethod
-    def init_from_dataset_id(data_object_id):
+    def init_from_dataset_id(
+        data_object_id, eager_data=False, max_workers=_DOWNLOAD_POOL_SIZE
+    ):
+        """
+        DataObjects of a dataset. With `eager_data`, their data is downloaded
+        up front using up to `max_workers` concurrent requests. `max_workers`
+        may not exceed the size of the download connection pool, 16, so every
+        connection is reused.
+        """
+        if max_workers > _DOWNLOAD_POOL_SIZE:
+            raise ValueError(
+                f"max_workers must be at most {_DOWNLOAD_POOL_SIZE}, "
+                f"got {max_workers}"
+            )
         connection = _check_api("data_objects")
 
         # array of attributes
         attributes_arr = connection.data_objects(data_object_id)
 
-        return [DataObject.init_from_attributes(a) for a in attributes_arr]
+        data_objects = [DataObject.init_from_attributes(a) for a in attributes_arr]
+        if eager_data and data_objects:
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                # Consume the results so download errors are raised here
+                list(executor.map(lambda data_object: data_object.data, data_objects))
+        return data_objects
 
     @property
     def container(self):
@@ -111,7 +152,7 @@ class DataObject(object):
         if self._data:
             return self._data
 
-        self._data = requests.get(self.url).content
+        self._data = _download_session().get(self.url).content
 
         return self._data
 
@@ -131,22 +172,23 @@ class DataObject(object):
     def dataframe(self):
         """Creates a simple Pandas Dataframe"""
         if self.format == "csv" or self.content_type == "text/csv":
-            return pd.read_csv(StringIO(self.data_str))
+            # read_csv decodes the UTF-8 bytes itself
+            return pd.read_csv(BytesIO(self.data))
         else:
             return pd.DataFrame(self.json)
 
-    def save_data(self, filepath, chunk_size=1024):
+    def save_data(self, filepath, chunk_size=1 << 20):
         """Save DataObject data to a file.  Useful for large files"""
         with open(filepath, "wb") as f:
             if self._data:
                 f.write(self._data)
                 return
 
-            r = requests.get(self.url, stream=True)
-
-            for chunk in r.iter_content(chunk_size=chunk_size):
-                if chunk:
-                    f.write(chunk)
+            with _download_session().get(self.url, stream=True) as r:
+                # Stream straight from the socket, decoding any transfer
+                # compression as iter_content would
+                r.raw.decode_content = True
+                shutil.copyfileobj(r.raw, f, chunk_size)
 
     def refresh(self):
         """Refresh DataObject as the url will expire after 1 hour"""
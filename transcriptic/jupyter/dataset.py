@@ -1,7 +1,5 @@
 import warnings
 
-from copy import deepcopy
-
 import pandas as pd
 
 from .common import _BaseObject
@@ -48,7 +46,10 @@ class Dataset(_BaseObject):
         Parameters
         ----------
         data_id: str
-            Dataset name or id in string form
+            Dataset name or id in string form. Names are resolved with a listing of
+            datasets kept per connection, which is only listed again when a name is
+            not found. Call `Dataset.clear_cache()` to pick up datasets renamed,
+            deleted or given a duplicate name since.
         attributes: Optional[dict]
             Attributes of the dataset
         connection: Optional[transcriptic.config.Connection]
@@ -120,8 +121,9 @@ class Dataset(_BaseObject):
         return self._data_objects
 
     def cross_ref_aliquots(self):
-        # Use the container.aliquots DataFrame as the base
-        aliquot_data = deepcopy(self.container.aliquots)
+        # Use the container.aliquots DataFrame as the base, copying its columns
+        # but sharing the cells since only a column is added
+        aliquot_data = self.container.aliquots.copy()
         data_column = []
         indices_without_data = []
         # Print a warning if new column will overwrite existing column
@@ -130,13 +132,17 @@ class Dataset(_BaseObject):
                 "Column 'Aliquot Data' will be overwritten with data pulled from "
                 "Dataset."
             )
-        # Look up data for every well index
+        # Look up data for every well index in the row labelled 0, indexed by
+        # humanized well index
+        data = self.data
+        data_row = data.loc[0].to_dict() if 0 in data.index else {}
+        container_type = self.container.container_type
         for index in aliquot_data.index:
             # Get humanized index
-            humanized_index = self.container.container_type.humanize(int(index))
-            if humanized_index in self.data:
+            humanized_index = container_type.humanize(int(index))
+            if humanized_index in data_row:
                 # Use humanized index to get data for that well
-                data_point = self.data.loc[0, humanized_index]
+                data_point = data_row[humanized_index]
             else:
                 # If no data for that well, use None instead
                 data_point = None
@@ -63,17 +63,14 @@ class Instruction(object):
         self.started_at = attributes["started_at"]
         self.completed_at = attributes["completed_at"]
         self.generated_containers = attributes["generated_containers"]
-        if len(attributes["warps"]) > 0:
-            device_id_set = set(
-                [warp["device_id"] for warp in self.attributes["warps"]]
-            )
-            self.device_id = device_id_set.pop()
-            if len(device_id_set) > 1:
+        warps = attributes["warps"]
+        if len(warps) > 0:
+            self.device_id = warps[0]["device_id"]
+            if any(warp["device_id"] != self.device_id for warp in warps):
                 warnings.warn(
                     "There is more than one device involved in this instruction. Please"
                     " contact Transcriptic for assistance."
                 )
-
         else:
             self.device_id = None
         self._warps = pd.DataFrame()
@@ -84,21 +81,26 @@ class Instruction(object):
         if self._warps.empty:
             warp_list = self.attributes["warps"]
             if len(warp_list) != 0:
-                self._warps = pd.DataFrame(x["command"] for x in warp_list)
-                self._warps.columns = [x.title() for x in self._warps.columns.tolist()]
+                commands, warp_ids, completed, started = [], [], [], []
+                for warp in warp_list:
+                    commands.append(warp["command"])
+                    warp_ids.append(warp["id"])
+                    completed.append(warp["reported_completed_at"])
+                    started.append(warp["reported_started_at"])
+                warps = pd.DataFrame(commands)
+                warps.columns = [x.title() for x in warps.columns.tolist()]
+                col_names = warps.columns.tolist()
                 # Rearrange columns to start with `Name`
-                if "Name" in self._warps.columns:
-                    col_names = ["Name"] + [
-                        col for col in self._warps.columns if col != "Name"
-                    ]
-                    self._warps = self._warps[col_names]
-                self._warps.insert(1, "WarpId", [x["id"] for x in warp_list])
-                self._warps.insert(
-                    2, "Completed", [x["reported_completed_at"] for x in warp_list]
-                )
-                self._warps.insert(
-                    3, "Started", [x["reported_started_at"] for x in warp_list]
-                )
+                if "Name" in col_names:
+                    col_names.remove("Name")
+                    col_names.insert(0, "Name")
+                    # Few distinct commands repeat across the warps
+                    warps["Name"] = warps["Name"].astype("category")
+                warps["WarpId"] = warp_ids
+                warps["Completed"] = completed
+                warps["Started"] = started
+                col_names[1:1] = ["WarpId", "Completed", "Started"]
+                self._warps = warps[col_names]
             else:
                 warnings.warn(
                     "There are no warps associated with this instruction. Please "
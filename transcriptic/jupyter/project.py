@@ -40,7 +40,10 @@ class Project(_BaseObject):
         Parameters
         ----------
         project_id: str
-            Project name or id in string form
+            Project name or id in string form. Names are resolved with a listing of
+            projects kept per connection, which is only listed again when a name is
+            not found. Call `Project.clear_cache()` to pick up projects renamed,
+            deleted or given a duplicate name since.
         attributes: Optional[dict]
             Attributes of the project
         connection: Optional[transcriptic.config.Connection]
@@ -65,12 +68,9 @@ class Project(_BaseObject):
             Returns a DataFrame of runs, with the id and title as columns
         """
         if self._runs.empty and use_cache:
-            temp = self.connection.env_args
-            self.connection.update_environment(project_id=self.id)
-            project_runs = self.connection.runs()
+            project_runs = self.connection.runs(project_id=self.id)
             self._runs = pd.DataFrame([[pr["id"], pr["title"]] for pr in project_runs])
             self._runs.columns = ["id", "Name"]
-            self.connection.env_args = temp
         return self._runs
 
     def submit(self, protocol, title, test_mode=False):
@@ -53,7 +53,10 @@ class Run(_BaseObject):
         Parameters
         ----------
         run_id: str
-            Run name or id in string form
+            Run name or id in string form. Names are resolved with a listing of
+            runs kept per connection, which is only listed again when a name is
+            not found. Call `Run.clear_cache()` to pick up runs renamed,
+            deleted or given a duplicate name since.
         attributes: Optional[dict]
             Attributes of the run
         connection: Optional[transcriptic.config.Connection]